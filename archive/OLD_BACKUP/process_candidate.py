@@ -4,9 +4,12 @@ Main script to process candidate documents using Gemini LLM
 Extracts only filled/checked information from questionnaires and resumes
 """
 
+import os
 import sys
+import re
 import json
 import logging
+import functools
 from pathlib import Path
 from datetime import datetime
 import traceback
@@ -28,6 +31,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Gemini often wraps JSON answers in markdown code fences
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.MULTILINE)
+
+
+def _strip_fences(content):
+    """Remove ```json ... ``` wrappers from a model response"""
+    return _FENCE_RE.sub('', content).strip()
+
+
+# Page number embedded in converted image filenames (page_1.jpg, page_10.jpg)
+_PAGE_NUM_RE = re.compile(r'(\d+)')
+
+
+def _page_sort_key(name):
+    """Sort page images numerically so page_10 follows page_9, not page_1"""
+    match = _PAGE_NUM_RE.search(name)
+    return (int(match.group(1)) if match else 0, name)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_convert(pdf_path, mtime, dpi, temp_dir):
+    """Rasterize a PDF once per (path, mtime, dpi) and return its page images"""
+    candidate_name = Path(pdf_path).stem
+    temp_folder = temp_dir / f"{candidate_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    output_folder = pdf_to_images(pdf_path, temp_folder, dpi)
+    if not output_folder:
+        # Raise rather than return so failures are not cached
+        raise Exception("Failed to convert PDF to images")
+    
+    entries = [e for e in os.scandir(output_folder) if e.name.endswith('.jpg')]
+    entries.sort(key=lambda e: _page_sort_key(e.name))
+    return tuple(Path(e.path) for e in entries)
+
 
 class CandidateProcessor:
     def __init__(self):
@@ -48,19 +85,11 @@ class CandidateProcessor:
         """Convert PDF to images for analysis"""
         logger.info(f"Converting PDF to images: {pdf_path}")
         
-        # Create temp directory for this candidate
-        candidate_name = Path(pdf_path).stem
-        temp_folder = self.temp_dir / f"{candidate_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        # Convert PDF to images
-        output_folder = pdf_to_images(pdf_path, temp_folder, IMAGE_DPI)
-        
-        if output_folder:
-            image_files = sorted(output_folder.glob("*.jpg"))
-            logger.info(f"Created {len(image_files)} images from PDF")
-            return image_files
-        else:
-            raise Exception("Failed to convert PDF to images")
+        # Reuse an earlier conversion of the same file if it hasn't changed
+        pdf_path = str(Path(pdf_path).resolve())
+        image_files = _cached_convert(pdf_path, os.path.getmtime(pdf_path), IMAGE_DPI, self.temp_dir)
+        logger.info(f"Created {len(image_files)} images from PDF")
+        return list(image_files)
     
     def analyze_questionnaire(self, image_files):
         """Analyze questionnaire images using Gemini"""
@@ -73,7 +102,7 @@ class CandidateProcessor:
         
         # Process each image
         for idx, image_file in enumerate(image_files):
-            logger.info(f"Processing page {idx + 1}/{len(image_files)}: {image_file.name}")
+            logger.info("Processing page %d/%d: %s", idx + 1, len(image_files), image_file.name)
             
             # Call Gemini using MCP
             try:
@@ -108,19 +137,20 @@ class CandidateProcessor:
                         "content": response.get("content", "")
                     })
                 else:
-                    logger.error(f"Gemini error on page {idx + 1}: {result.stderr}")
+                    logger.error("Gemini error on page %d: %s", idx + 1, result.stderr)
                     
             except Exception as e:
-                logger.error(f"Error processing page {idx + 1}: {str(e)}")
+                logger.error("Error processing page %d: %s", idx + 1, e)
                 
         return results
     
-    def analyze_resume(self, pdf_path):
-        """Analyze resume PDF"""
+    def analyze_resume(self, pdf_path, image_files=None):
+        """Analyze resume PDF, optionally from already-converted page images"""
         logger.info(f"Analyzing resume: {pdf_path}")
         
         # Convert resume to images
-        image_files = self.convert_pdf_to_images(pdf_path)
+        if image_files is None:
+            image_files = self.convert_pdf_to_images(pdf_path)
         
         # Load resume analyzer prompt
         resume_prompt = """
@@ -163,7 +193,7 @@ class CandidateProcessor:
                     results.append(response.get("content", ""))
                     
             except Exception as e:
-                logger.error(f"Error analyzing resume: {str(e)}")
+                logger.error("Error analyzing resume: %s", e)
                 
         return "\n".join(results)
     
@@ -174,22 +204,30 @@ class CandidateProcessor:
         # Parse questionnaire results
         filled_items = {}
         for page_result in questionnaire_data:
+            page_num = page_result.get("page", "?")
+            content = _strip_fences(page_result.get("content", "") or "")
+            if not content:
+                continue
+            
             try:
-                content = page_result.get("content", "")
-                if content and content.strip():
-                    # Try to parse as JSON
-                    if content.startswith("{"):
-                        page_data = json.loads(content)
-                        # Merge with existing data
-                        for key, value in page_data.items():
-                            if key not in filled_items:
-                                filled_items[key] = value
-                            elif isinstance(value, dict) and isinstance(filled_items[key], dict):
-                                filled_items[key].update(value)
-                            elif isinstance(value, list) and isinstance(filled_items[key], list):
-                                filled_items[key].extend(value)
-            except json.JSONDecodeError:
-                logger.warning(f"Could not parse page content as JSON")
+                page_data = json.loads(content)
+            except json.JSONDecodeError as e:
+                logger.warning("Could not parse page %s content as JSON: %s", page_num, e)
+                continue
+            
+            if not isinstance(page_data, dict):
+                logger.warning("Page %s returned %s, expected a JSON object", page_num, type(page_data).__name__)
+                continue
+            
+            # Merge with existing data
+            for key, value in page_data.items():
+                existing = filled_items.setdefault(key, value)
+                if existing is value:
+                    continue
+                if isinstance(existing, dict) and isinstance(value, dict):
+                    existing.update(value)
+                elif isinstance(existing, list) and isinstance(value, list):
+                    existing.extend(value)
         
         # Combine with resume data
         summary = {
@@ -265,7 +303,8 @@ class CandidateProcessor:
             # Process resume
             resume_data = ""
             if resume_path and Path(resume_path).exists():
-                resume_data = self.analyze_resume(resume_path)
+                resume_images = self.convert_pdf_to_images(resume_path)
+                resume_data = self.analyze_resume(resume_path, resume_images)
             
             # Process questionnaire
             questionnaire_data = []
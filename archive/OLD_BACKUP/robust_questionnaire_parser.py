@@ -11,6 +11,140 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_NAME_RE = re.compile(r'^([A-Za-z\s]+)')
+_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+# 1. Industries worked in
+INDUSTRIES = ('Civil and Engineering', 'Construction', 'Open Pit Mining', 'Logging')
+
+# 5. Positions interested in
+POSITIONS = (
+    'Journeyman Heavy Equipment Technician', 'Maintenance Planner', 'Maintenance Scheduler',
+    'Journeyman Welder', 'Fuel and Lube Truck Operator', 'Journeyman Industrial/Construction Electrician',
+    'Supervisor/Foreman', 'Labourer', 'Heavy Equipment Operator', 'Sales Representative',
+    'Administrative Assistant', 'HR Coordinator', 'Finance and Accounting Professional',
+    'Journeyman Machinist', 'Journeyman Millwright'
+)
+
+# 28. Underground machinery brands
+UNDERGROUND_BRANDS = ('Sandvik', 'Epiroc', 'Komatsu', 'Normet', 'Liebherr', 'Joy Global')
+
+# Single-answer questions: response key -> pattern whose group(1) is the
+# selected answer. Compiled once at import instead of on every parse.
+_RESPONSE_PATTERNS = {
+    # 2. Fast-paced environment
+    'comfortable_fast_paced': re.compile(r'fast-paced environment.*?(Yes|No)', re.IGNORECASE),
+    # 3. Physical limitations
+    'physical_limitations': re.compile(r'physical.*?limitations.*?(No|Yes.*?)(?:\s|$)', re.IGNORECASE),
+    # 4. Mining experience
+    'mining_experience': re.compile(r'mining industry experience.*?(Yes|No)', re.IGNORECASE),
+    # 6. Winter and rain gear
+    'owns_weather_gear': re.compile(r'winter and rain gear.*?(Yes|No)', re.IGNORECASE),
+    # 7. Rotational shifts (days/nights)
+    'willing_day_night_rotation': re.compile(r'rotational shifts.*?days.*?nights.*?(Yes|No)', re.IGNORECASE),
+    # 8. Share service truck
+    'willing_share_truck': re.compile(r'share a service truck.*?(Yes|No)', re.IGNORECASE),
+    # 9. Beard/clean shaven
+    'beard_policy': re.compile(r'beard.*?clean shaven.*?(Does Not Apply|Yes|No)', re.IGNORECASE),
+    # 10. Apprentice status
+    'apprentice_status': re.compile(r'registered Apprentice.*?(Does not apply|.*?year)', re.IGNORECASE),
+    # Legal Information
+    # 11. Background check
+    'background_check': re.compile(r'criminal background check.*?(Yes|No)', re.IGNORECASE),
+    # 12. Work authorization
+    'work_authorization': re.compile(r'legally able to work.*?(Yes|No)', re.IGNORECASE),
+    # 13. Drug test
+    'drug_test': re.compile(r'drug and alcohol test.*?(Yes|No)', re.IGNORECASE),
+    # 14. Driver's license
+    'drivers_license': re.compile(r'Class 5 driver.*?(Yes|No)', re.IGNORECASE),
+    # 15. Clean driving record
+    'clean_driving_record': re.compile(r'driver.*?abstract clean.*?(Yes|No)', re.IGNORECASE),
+    # Skills & Experience
+    # 16. Komatsu PC 5500 (FIXED - was 5000)
+    'komatsu_pc5500_experience': re.compile(r'Komatsu PC.*?55.*?(Yes|No)', re.IGNORECASE),
+    # 17. Service truck years
+    'service_truck_experience': re.compile(r'service truck.*?(Other.*?career.*?\d+.*?years?|.*?years?)', re.IGNORECASE),
+    # 18. Line boring machine
+    'line_boring_machine': re.compile(r'portable line boring machine.*?(Yes|No)', re.IGNORECASE),
+    # 19. CNC machines
+    'cnc_experience': re.compile(r'CNC machines.*?(Yes|No)', re.IGNORECASE),
+    # 20. Off-road equipment experience
+    'offroad_equipment_experience': re.compile(r'off-road construction equipment.*?(Other.*?equipment.*?years?|.*?years?)', re.IGNORECASE),
+    # 21. Surface mining drills
+    'surface_mining_drills': re.compile(r'surface mining drills.*?(None|.*?years?)', re.IGNORECASE),
+    # 22. CAT ET & SIS
+    'cat_et_sis_level': re.compile(r'CAT ET.*?SIS.*?(Beginner|Intermediate|Advanced|Expert)', re.IGNORECASE),
+    # 23. PMs, hydraulics, troubleshooting
+    'pm_hydraulics_level': re.compile(r'PMs.*?hydraulics.*?troubleshooting.*?(Beginner|Intermediate|Proficient|Expert)', re.IGNORECASE),
+    # 24. Large mining equipment
+    'large_mining_equipment': re.compile(r'large mining equipment.*?(No Experience|Beginner|Intermediate|Advanced)', re.IGNORECASE),
+    # 25. Red Seal
+    'red_seal': re.compile(r'Red Seal.*?(Yes|No)', re.IGNORECASE),
+    # 26. Journeyman license
+    'journeyman_license': re.compile(r'Journeyman Off-Road License.*?(Yes|No)', re.IGNORECASE),
+    # 27. Line boring years
+    'line_boring_years': re.compile(r'line boring.*?years.*?(No Experience|.*?years?)', re.IGNORECASE),
+    # 29. Hydraulic systems level
+    'hydraulic_systems_level': re.compile(r'hydraulic systems.*?underground.*?(Beginner|Intermediate|Advanced|Expert)', re.IGNORECASE),
+    # 30. Underground experience
+    'underground_experience': re.compile(r'underground environments.*?(Yes|No)', re.IGNORECASE),
+    # Employment Status
+    # 31. Still with current company
+    'still_with_current': re.compile(r'current company.*?resume.*?(Yes|No)', re.IGNORECASE),
+    # 32. Worked here before
+    'worked_here_before': re.compile(r'worked for us before.*?(Yes|No)', re.IGNORECASE),
+    # 33. Current employment status
+    'employment_status': re.compile(r'current employment status.*?(Employed|Unemployed|.*?)', re.IGNORECASE),
+    # 34. Availability
+    'availability': re.compile(r'available to start.*?(Within.*?month|Immediately|.*?)', re.IGNORECASE),
+    # 35. Time off booked
+    'time_off_booked': re.compile(r'time off booked.*?(Yes|No)', re.IGNORECASE),
+    # 36. Reason for looking
+    'reason_for_looking': re.compile(r'looking for.*?opportunity.*?(Work-Life Balance|.*?)', re.IGNORECASE),
+    # 37. Knows current employees
+    'knows_employees': re.compile(r'know anyone.*?working for us.*?(Yes|No)', re.IGNORECASE),
+    # 38. Contractor preference
+    'contractor_preference': re.compile(r'contractor.*?sub-contractor.*?(No.*?employee|Yes)', re.IGNORECASE),
+    # Work Preferences
+    # 39. Different mine sites
+    'willing_different_sites': re.compile(r'different mine sites.*?(Yes|No)', re.IGNORECASE),
+    # 40. Field work
+    'comfortable_field_work': re.compile(r'working in the field.*?(Yes|No)', re.IGNORECASE),
+    # 41. Extended periods away
+    'commit_extended_periods': re.compile(r'away from home.*?extended.*?(Yes|No)', re.IGNORECASE),
+    # 42. 3 weeks on/off rotation
+    'willing_3week_rotation': re.compile(r'3 weeks on/off.*?(Yes|No)', re.IGNORECASE),
+    # 43. Shared housing
+    'comfortable_shared_housing': re.compile(r'shared housing.*?(Yes|No)', re.IGNORECASE),
+}
+
+# Every pattern above starts with a literal anchor, and no match can begin
+# before the first occurrence of that anchor. Locating all anchors in one
+# lowercased copy of the text lets each pattern start searching where it can
+# actually match, and skip documents that don't contain its question at all.
+_ANCHORS = {
+    key: pattern.pattern.split('.*?', 1)[0].lower()
+    for key, pattern in _RESPONSE_PATTERNS.items()
+}
+
+
+def _anchor_positions(text: str) -> Dict[str, Optional[int]]:
+    """Where each single-answer pattern should start searching (None = no match possible)"""
+    lowered = text.lower()
+    # str.lower() only mirrors re.IGNORECASE offsets exactly for ASCII text;
+    # otherwise never rule a question out and only trust same-length offsets
+    exact = text.isascii()
+    same_offsets = exact or len(lowered) == len(text)
+    
+    positions = {}
+    for key, anchor in _ANCHORS.items():
+        pos = lowered.find(anchor)
+        if pos < 0:
+            positions[key] = None if exact else 0
+        else:
+            positions[key] = pos if same_offsets else 0
+    return positions
+
 class RobustQuestionnaireParser:
     """Parse Dayforce questionnaires with specific format handling"""
     
@@ -43,16 +177,15 @@ class RobustQuestionnaireParser:
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize the text for parsing"""
-        # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        text = text.replace('\n', ' ')
-        return text.strip()
+        # Collapse every whitespace run (newlines included) to one space and
+        # trim the ends in a single C-level split/join
+        return ' '.join(text.split())
     
     def _extract_candidate_info(self, text: str) -> Dict[str, str]:
         """Extract basic candidate information"""
         
         # Extract name (first line typically)
-        name_match = re.search(r'^([A-Za-z\s]+)', text)
+        name_match = _NAME_RE.search(text)
         name = name_match.group(1).strip() if name_match else "Unknown"
         
         # Extract position
@@ -63,7 +196,7 @@ class RobustQuestionnaireParser:
             position = 'Heavy Equipment Technician'
         
         # Extract date
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})', text)
+        date_match = _DATE_RE.search(text)
         date = date_match.group(1) if date_match else "Unknown"
         
         return {
@@ -77,204 +210,22 @@ class RobustQuestionnaireParser:
         
         responses = {}
         
-        # 1. Industries worked in
-        responses['industries_worked'] = []
-        if 'Civil and Engineering' in text:
-            responses['industries_worked'].append('Civil and Engineering')
-        if 'Construction' in text:
-            responses['industries_worked'].append('Construction')
-        if 'Open Pit Mining' in text:
-            responses['industries_worked'].append('Open Pit Mining')
-        if 'Logging' in text:
-            responses['industries_worked'].append('Logging')
-        
-        # 2. Fast-paced environment
-        fast_paced_match = re.search(r'fast-paced environment.*?(Yes|No)', text, re.IGNORECASE)
-        responses['comfortable_fast_paced'] = fast_paced_match.group(1) if fast_paced_match else None
-        
-        # 3. Physical limitations
-        limitations_match = re.search(r'physical.*?limitations.*?(No|Yes.*?)(?:\s|$)', text, re.IGNORECASE)
-        responses['physical_limitations'] = limitations_match.group(1) if limitations_match else None
-        
-        # 4. Mining experience
-        mining_match = re.search(r'mining industry experience.*?(Yes|No)', text, re.IGNORECASE)
-        responses['mining_experience'] = mining_match.group(1) if mining_match else None
-        if 'Machine is a machine' in text:
-            responses['mining_experience_comment'] = 'Machine is a machine, just different attachment'
-        
-        # 5. Positions interested in
-        responses['positions_interested'] = []
-        positions = [
-            'Journeyman Heavy Equipment Technician', 'Maintenance Planner', 'Maintenance Scheduler',
-            'Journeyman Welder', 'Fuel and Lube Truck Operator', 'Journeyman Industrial/Construction Electrician',
-            'Supervisor/Foreman', 'Labourer', 'Heavy Equipment Operator', 'Sales Representative',
-            'Administrative Assistant', 'HR Coordinator', 'Finance and Accounting Professional',
-            'Journeyman Machinist', 'Journeyman Millwright'
-        ]
-        for position in positions:
-            if position in text:
-                responses['positions_interested'].append(position)
-        
-        # 6. Winter and rain gear
-        gear_match = re.search(r'winter and rain gear.*?(Yes|No)', text, re.IGNORECASE)
-        responses['owns_weather_gear'] = gear_match.group(1) if gear_match else None
-        
-        # 7. Rotational shifts (days/nights)
-        rotation_match = re.search(r'rotational shifts.*?days.*?nights.*?(Yes|No)', text, re.IGNORECASE)
-        responses['willing_day_night_rotation'] = rotation_match.group(1) if rotation_match else None
-        
-        # 8. Share service truck
-        truck_match = re.search(r'share a service truck.*?(Yes|No)', text, re.IGNORECASE)
-        responses['willing_share_truck'] = truck_match.group(1) if truck_match else None
-        
-        # 9. Beard/clean shaven
-        beard_match = re.search(r'beard.*?clean shaven.*?(Does Not Apply|Yes|No)', text, re.IGNORECASE)
-        responses['beard_policy'] = beard_match.group(1) if beard_match else None
-        
-        # 10. Apprentice status
-        apprentice_match = re.search(r'registered Apprentice.*?(Does not apply|.*?year)', text, re.IGNORECASE)
-        responses['apprentice_status'] = apprentice_match.group(1) if apprentice_match else None
-        
-        # Legal Information
-        # 11. Background check
-        bg_match = re.search(r'criminal background check.*?(Yes|No)', text, re.IGNORECASE)
-        responses['background_check'] = bg_match.group(1) if bg_match else None
-        
-        # 12. Work authorization
-        auth_match = re.search(r'legally able to work.*?(Yes|No)', text, re.IGNORECASE)
-        responses['work_authorization'] = auth_match.group(1) if auth_match else None
-        
-        # 13. Drug test
-        drug_match = re.search(r'drug and alcohol test.*?(Yes|No)', text, re.IGNORECASE)
-        responses['drug_test'] = drug_match.group(1) if drug_match else None
-        
-        # 14. Driver's license
-        license_match = re.search(r'Class 5 driver.*?(Yes|No)', text, re.IGNORECASE)
-        responses['drivers_license'] = license_match.group(1) if license_match else None
-        
-        # 15. Clean driving record
-        record_match = re.search(r'driver.*?abstract clean.*?(Yes|No)', text, re.IGNORECASE)
-        responses['clean_driving_record'] = record_match.group(1) if record_match else None
-        
-        # Skills & Experience
-        # 16. Komatsu PC 5500 (FIXED - was 5000)
-        komatsu_match = re.search(r'Komatsu PC.*?55.*?(Yes|No)', text, re.IGNORECASE)
-        responses['komatsu_pc5500_experience'] = komatsu_match.group(1) if komatsu_match else None
-        
-        # 17. Service truck years
-        service_truck_match = re.search(r'service truck.*?(Other.*?career.*?\d+.*?years?|.*?years?)', text, re.IGNORECASE)
-        responses['service_truck_experience'] = service_truck_match.group(1) if service_truck_match else None
-        
-        # 18. Line boring machine
-        boring_match = re.search(r'portable line boring machine.*?(Yes|No)', text, re.IGNORECASE)
-        responses['line_boring_machine'] = boring_match.group(1) if boring_match else None
-        
-        # 19. CNC machines
-        cnc_match = re.search(r'CNC machines.*?(Yes|No)', text, re.IGNORECASE)
-        responses['cnc_experience'] = cnc_match.group(1) if cnc_match else None
-        
-        # 20. Off-road equipment experience
-        offroad_match = re.search(r'off-road construction equipment.*?(Other.*?equipment.*?years?|.*?years?)', text, re.IGNORECASE)
-        responses['offroad_equipment_experience'] = offroad_match.group(1) if offroad_match else None
-        
-        # 21. Surface mining drills
-        drills_match = re.search(r'surface mining drills.*?(None|.*?years?)', text, re.IGNORECASE)
-        responses['surface_mining_drills'] = drills_match.group(1) if drills_match else None
-        
-        # 22. CAT ET & SIS
-        cat_match = re.search(r'CAT ET.*?SIS.*?(Beginner|Intermediate|Advanced|Expert)', text, re.IGNORECASE)
-        responses['cat_et_sis_level'] = cat_match.group(1) if cat_match else None
-        
-        # 23. PMs, hydraulics, troubleshooting
-        pm_match = re.search(r'PMs.*?hydraulics.*?troubleshooting.*?(Beginner|Intermediate|Proficient|Expert)', text, re.IGNORECASE)
-        responses['pm_hydraulics_level'] = pm_match.group(1) if pm_match else None
-        
-        # 24. Large mining equipment
-        large_equip_match = re.search(r'large mining equipment.*?(No Experience|Beginner|Intermediate|Advanced)', text, re.IGNORECASE)
-        responses['large_mining_equipment'] = large_equip_match.group(1) if large_equip_match else None
-        
-        # 25. Red Seal
-        red_seal_match = re.search(r'Red Seal.*?(Yes|No)', text, re.IGNORECASE)
-        responses['red_seal'] = red_seal_match.group(1) if red_seal_match else None
-        
-        # 26. Journeyman license
-        journeyman_match = re.search(r'Journeyman Off-Road License.*?(Yes|No)', text, re.IGNORECASE)
-        responses['journeyman_license'] = journeyman_match.group(1) if journeyman_match else None
-        
-        # 27. Line boring years
-        boring_years_match = re.search(r'line boring.*?years.*?(No Experience|.*?years?)', text, re.IGNORECASE)
-        responses['line_boring_years'] = boring_years_match.group(1) if boring_years_match else None
-        
-        # 28. Underground machinery brands
-        responses['underground_brands'] = []
-        brands = ['Sandvik', 'Epiroc', 'Komatsu', 'Normet', 'Liebherr', 'Joy Global']
-        for brand in brands:
-            if brand in text:
-                responses['underground_brands'].append(brand)
+        # Multi-select questions
+        responses['industries_worked'] = [i for i in INDUSTRIES if i in text]
+        responses['positions_interested'] = [p for p in POSITIONS if p in text]
+        responses['underground_brands'] = [b for b in UNDERGROUND_BRANDS if b in text]
         if 'None of the above' in text:
             responses['underground_brands'] = ['None of the above']
         
-        # 29. Hydraulic systems level
-        hydraulic_match = re.search(r'hydraulic systems.*?underground.*?(Beginner|Intermediate|Advanced|Expert)', text, re.IGNORECASE)
-        responses['hydraulic_systems_level'] = hydraulic_match.group(1) if hydraulic_match else None
-        
-        # 30. Underground experience
-        underground_match = re.search(r'underground environments.*?(Yes|No)', text, re.IGNORECASE)
-        responses['underground_experience'] = underground_match.group(1) if underground_match else None
-        
-        # Employment Status
-        # 31. Still with current company
-        current_match = re.search(r'current company.*?resume.*?(Yes|No)', text, re.IGNORECASE)
-        responses['still_with_current'] = current_match.group(1) if current_match else None
+        # Single-answer questions
+        positions = _anchor_positions(text)
+        for key, pattern in _RESPONSE_PATTERNS.items():
+            pos = positions[key]
+            match = pattern.search(text, pos) if pos is not None else None
+            responses[key] = match.group(1) if match else None
         
-        # 32. Worked here before
-        worked_before_match = re.search(r'worked for us before.*?(Yes|No)', text, re.IGNORECASE)
-        responses['worked_here_before'] = worked_before_match.group(1) if worked_before_match else None
-        
-        # 33. Current employment status
-        status_match = re.search(r'current employment status.*?(Employed|Unemployed|.*?)', text, re.IGNORECASE)
-        responses['employment_status'] = status_match.group(1) if status_match else None
-        
-        # 34. Availability
-        avail_match = re.search(r'available to start.*?(Within.*?month|Immediately|.*?)', text, re.IGNORECASE)
-        responses['availability'] = avail_match.group(1) if avail_match else None
-        
-        # 35. Time off booked
-        time_off_match = re.search(r'time off booked.*?(Yes|No)', text, re.IGNORECASE)
-        responses['time_off_booked'] = time_off_match.group(1) if time_off_match else None
-        
-        # 36. Reason for looking
-        reason_match = re.search(r'looking for.*?opportunity.*?(Work-Life Balance|.*?)', text, re.IGNORECASE)
-        responses['reason_for_looking'] = reason_match.group(1) if reason_match else None
-        
-        # 37. Knows current employees
-        knows_match = re.search(r'know anyone.*?working for us.*?(Yes|No)', text, re.IGNORECASE)
-        responses['knows_employees'] = knows_match.group(1) if knows_match else None
-        
-        # 38. Contractor preference
-        contractor_match = re.search(r'contractor.*?sub-contractor.*?(No.*?employee|Yes)', text, re.IGNORECASE)
-        responses['contractor_preference'] = contractor_match.group(1) if contractor_match else None
-        
-        # Work Preferences
-        # 39. Different mine sites
-        sites_match = re.search(r'different mine sites.*?(Yes|No)', text, re.IGNORECASE)
-        responses['willing_different_sites'] = sites_match.group(1) if sites_match else None
-        
-        # 40. Field work
-        field_match = re.search(r'working in the field.*?(Yes|No)', text, re.IGNORECASE)
-        responses['comfortable_field_work'] = field_match.group(1) if field_match else None
-        
-        # 41. Extended periods away
-        away_match = re.search(r'away from home.*?extended.*?(Yes|No)', text, re.IGNORECASE)
-        responses['commit_extended_periods'] = away_match.group(1) if away_match else None
-        
-        # 42. 3 weeks on/off rotation
-        rotation3_match = re.search(r'3 weeks on/off.*?(Yes|No)', text, re.IGNORECASE)
-        responses['willing_3week_rotation'] = rotation3_match.group(1) if rotation3_match else None
-        
-        # 43. Shared housing
-        housing_match = re.search(r'shared housing.*?(Yes|No)', text, re.IGNORECASE)
-        responses['comfortable_shared_housing'] = housing_match.group(1) if housing_match else None
+        if 'Machine is a machine' in text:
+            responses['mining_experience_comment'] = 'Machine is a machine, just different attachment'
         
         return responses
     
@@ -341,12 +292,12 @@ class RobustQuestionnaireParser:
 if __name__ == "__main__":
     import fitz
     
-    # Read the PDF
-    doc = fitz.open('/mnt/c/Users/angel/Downloads/Recruiting - Dayforce.pdf')
-    text = ''
-    for page in doc:
-        text += page.get_text()
-    doc.close()
+    # Read the PDF - plain text flags skip block/layout analysis
+    with fitz.open('/mnt/c/Users/angel/Downloads/Recruiting - Dayforce.pdf') as doc:
+        text = ''.join(
+            doc.get_page_text(page_num, flags=fitz.TEXTFLAGS_TEXT)
+            for page_num in range(doc.page_count)
+        )
     
     # Parse with robust parser
     parser = RobustQuestionnaireParser()
@@ -36,11 +36,22 @@ LOG_FILE = BASE_DIR / "candidate_processor.log"
 # CATS API Settings
 CATS_COMPANY_ID = os.getenv("CATS_COMPANY_ID")
 CATS_SITE_ID = os.getenv("CATS_SITE_ID")
+CATS_CACHE_TTL = int(os.getenv("CATS_CACHE_TTL", 60))  # seconds to reuse candidate attachments/tags/pipelines
+CATS_MAX_RPS = float(os.getenv("CATS_MAX_RPS", 10))  # outgoing CATS requests per second
+CATS_BREAKER_FAIL_MAX = int(os.getenv("CATS_BREAKER_FAIL_MAX", 5))  # consecutive failures before the circuit opens
+CATS_BREAKER_RESET = int(os.getenv("CATS_BREAKER_RESET", 30))  # seconds the circuit stays open
+CATS_MAX_TOKEN_WAIT = float(os.getenv("CATS_MAX_TOKEN_WAIT", 5))  # longest a request waits on the rate limit before failing
+
+# Local candidate name index (SQLite FTS5) used by CandidateMatcher
+CANDIDATE_INDEX_DB = os.getenv("CANDIDATE_INDEX_DB", str(BASE_DIR / "candidates.db"))
+CANDIDATE_INDEX_MAX_AGE = int(os.getenv("CANDIDATE_INDEX_MAX_AGE", 3600))  # seconds before the index counts as stale
 
 # Webhook Configuration
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")  # Shared secret for webhook verification
 MANAGER_REVIEW_STATUS_ID = os.getenv("MANAGER_REVIEW_STATUS_ID", "")  # CATS status ID for "manager review needed"
 QUESTIONNAIRE_FIELD_ID = os.getenv("QUESTIONNAIRE_FIELD_ID", "")  # Custom field ID for questionnaire PDF
+WEBHOOK_STATE_DB = os.getenv("WEBHOOK_STATE_DB", CANDIDATE_INDEX_DB)  # SQLite file holding dedupe keys and candidate locks shared by webhook workers
+CANDIDATE_LOCK_TTL = int(os.getenv("CANDIDATE_LOCK_TTL", 900))  # seconds before a crashed worker's candidate lock can be taken over
 
 # Slack Configuration
 SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID", "")  # Channel ID for manager notifications
@@ -4,16 +4,128 @@ Handles API communication with CATS for candidate and job management
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
+import threading
+import time
 import sys
 sys.path.append('/home/gotime2022/recruitment_ops')
-from catsone.config import CATS_API_KEY, CATS_API_URL, CATS_COMPANY_ID
+from catsone.config import (
+    CATS_API_KEY, CATS_API_URL, CATS_COMPANY_ID, CATS_CACHE_TTL,
+    CATS_MAX_RPS, CATS_BREAKER_FAIL_MAX, CATS_BREAKER_RESET, CATS_MAX_TOKEN_WAIT
+)
 
 logger = logging.getLogger(__name__)
 
+# Lowercased tag title -> CATS tag id; reloaded only when a lookup finds no match
+_tag_ids = {}
+
+
+class CATSUnavailableError(requests.exceptions.ConnectionError):
+    """Raised without calling CATS while the circuit breaker is open"""
+
+
+class CATSRateLimitedError(CATSUnavailableError):
+    """Raised without calling CATS when the rate-limit backlog exceeds CATS_MAX_TOKEN_WAIT"""
+
+
+class GuardedAdapter(HTTPAdapter):
+    """HTTPAdapter with a token-bucket rate limit and a consecutive-failure circuit breaker
+    
+    CLOSED -> OPEN after fail_max consecutive failures -> HALF_OPEN once reset_timeout
+    passes, where a single trial request goes out and every other caller fails fast.
+    """
+    
+    def __init__(self, *args, max_rps=CATS_MAX_RPS, fail_max=CATS_BREAKER_FAIL_MAX,
+                 reset_timeout=CATS_BREAKER_RESET, max_token_wait=CATS_MAX_TOKEN_WAIT, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_rps = max_rps
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.max_token_wait = max_token_wait
+        self._tokens = float(max_rps)
+        self._last_refill = time.monotonic()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def send(self, request, **kwargs):
+        trial = self._admit()
+        try:
+            self._acquire_token()
+        except CATSRateLimitedError:
+            if trial:
+                with self._lock:
+                    self._trial_in_flight = False
+            raise
+        
+        ok = False
+        try:
+            response = super().send(request, **kwargs)
+            ok = response.status_code < 500 and response.status_code != 429
+            return response
+        finally:
+            self._record(ok, trial)
+    
+    def is_open(self) -> bool:
+        """True while requests would fail fast: open and cooling down, or half-open with the trial out"""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            return self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout
+    
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a trial request through"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            return max(0, int(self.reset_timeout - (time.monotonic() - self._opened_at)) + 1)
+    
+    def _admit(self) -> bool:
+        """Let a request through or raise; returns True if it is the half-open trial"""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if not self._trial_in_flight and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._trial_in_flight = True
+                return True
+        raise CATSUnavailableError(f"CATS circuit open after {self._failures} consecutive failures")
+    
+    def _record(self, ok: bool, trial: bool):
+        with self._lock:
+            if trial:
+                self._trial_in_flight = False
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            # A failed trial re-opens for another full reset_timeout
+            if trial or self._failures >= self.fail_max:
+                if self._opened_at is None:
+                    logger.warning(f"CATS circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+    
+    def _acquire_token(self):
+        """Reserve the next token, sleeping for it only if that's within max_token_wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.max_rps, self._tokens + (now - self._last_refill) * self.max_rps)
+            self._last_refill = now
+            wait = max(0.0, (1 - self._tokens) / self.max_rps)
+            if wait > self.max_token_wait:
+                raise CATSRateLimitedError(f"CATS rate limit backlog is {wait:.1f}s, not waiting")
+            # Tokens may go negative: later callers queue behind this reservation
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+
 
 class CATSClient:
     """Client for CATS ATS API v3"""
@@ -25,6 +137,26 @@ class CATSClient:
             "Authorization": f"Token {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Shared session: keep-alive connection pool, retries on transient errors,
+        # plus a rate limit and circuit breaker so a struggling CATS isn't piled on
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self.adapter = GuardedAdapter(pool_connections=20, pool_maxsize=50, max_retries=retry)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        
+        # (candidate_id, resource) -> [expires_at, etag, items]; stale entries are revalidated with If-None-Match
+        self._embedded_cache = {}
+        self._embedded_cache_lock = threading.Lock()
+    
+    def warmup(self):
+        """Open a pooled connection (DNS + TLS) with one tiny request so the first webhook doesn't pay for it"""
+        try:
+            self.session.get(f"{self.base_url}/candidates", params={"per_page": 1}, timeout=10)
+        except Exception as e:
+            logger.warning(f"CATS warmup request failed: {e}")
     
     def get_job_orders(self, status="open"):
         """Get all job orders/openings"""
@@ -34,7 +166,7 @@ class CATSClient:
         }
         
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
+            response = self.session.get(endpoint, params=params)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -46,7 +178,7 @@ class CATSClient:
         endpoint = f"{self.base_url}/jobs/{job_id}"
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.session.get(endpoint)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -59,13 +191,65 @@ class CATSClient:
         params = {"query": query}
         
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
+            response = self.session.get(endpoint, params=params)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Error searching candidates: {e}")
             return None
     
+    def get_tag_ids(self, phrase):
+        """Ids of every tag whose title contains phrase (case-insensitive); None if tags can't be fetched"""
+        phrase = phrase.lower()
+        matches = [tag_id for title, tag_id in _tag_ids.items() if phrase in title]
+        if matches:
+            return matches
+        
+        # First lookup, or the tag was created since the list was loaded
+        url, params = f"{self.base_url}/tags", {"per_page": 100}
+        try:
+            while url:
+                response = self.session.get(url, params=params)
+                response.raise_for_status()
+                data = response.json()
+                for tag in data.get('_embedded', {}).get('tags', []):
+                    _tag_ids[tag.get('title', '').lower()] = tag.get('id')
+                url, params = data.get('_links', {}).get('next', {}).get('href'), None
+        except Exception as e:
+            logger.error(f"Error fetching tags: {e}")
+            return None
+        return [tag_id for title, tag_id in _tag_ids.items() if phrase in title]
+    
+    def list_candidates_by_tag(self, phrase, limit=100, page_size=100):
+        """The limit most recently modified candidates carrying any tag whose title contains phrase
+        
+        One filtered search covers every matching tag (e.g. "Questionnaire Completed" and
+        "Application Status: Questionnaire Completed"). Returns None if no tag matches or the
+        filter fails, so callers can fall back to checking tags per candidate.
+        """
+        tag_ids = self.get_tag_ids(phrase)
+        if not tag_ids:
+            logger.error(f"No tag containing '{phrase}' found in CATS")
+            return None
+        
+        url = f"{self.base_url}/candidates/search"
+        params = {"per_page": min(page_size, limit), "sort": "-date_modified"}
+        tag_filters = [{"field": "tag_id", "filter": "exactly", "value": tag_id} for tag_id in tag_ids]
+        tag_filter = tag_filters[0] if len(tag_filters) == 1 else {"or": tag_filters}
+        candidates = []
+        try:
+            while url and len(candidates) < limit:
+                response = self.session.post(url, params=params, json=tag_filter)
+                response.raise_for_status()
+                data = response.json()
+                candidates.extend(data.get('_embedded', {}).get('candidates', []))
+                # The next link already carries page/per_page
+                url, params = data.get('_links', {}).get('next', {}).get('href'), None
+        except Exception as e:
+            logger.error(f"Error filtering candidates by tag '{phrase}': {e}")
+            return None
+        return candidates[:limit]
+    
     def create_candidate(self, candidate_data):
         """Create new candidate record"""
         endpoint = f"{self.base_url}/candidates"
@@ -85,7 +269,7 @@ class CATSClient:
         }
         
         try:
-            response = requests.post(endpoint, headers=self.headers, json=cats_data)
+            response = self.session.post(endpoint, json=cats_data)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -102,7 +286,7 @@ class CATSClient:
         }
         
         try:
-            response = requests.post(endpoint, headers=self.headers, json=data)
+            response = self.session.post(endpoint, json=data)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -124,7 +308,7 @@ class CATSClient:
             data["joborder_id"] = job_id
         
         try:
-            response = requests.post(endpoint, headers=self.headers, json=data)
+            response = self.session.post(endpoint, json=data)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -139,8 +323,7 @@ class CATSClient:
             with open(file_path, 'rb') as f:
                 files = {'file': f}
                 # Remove Content-Type for multipart upload
-                headers = {"Authorization": f"Token {self.api_key}"}
-                response = requests.post(endpoint, headers=headers, files=files)
+                response = self.session.post(endpoint, headers={"Content-Type": None}, files=files)
                 response.raise_for_status()
                 return response.json()
         except Exception as e:
@@ -152,7 +335,7 @@ class CATSClient:
         endpoint = f"{self.base_url}/candidates/{candidate_id}"
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.session.get(endpoint)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -178,7 +361,7 @@ class CATSClient:
                 "notes": notes
             }
             
-            response = requests.put(endpoint, headers=self.headers, json=data)
+            response = self.session.put(endpoint, json=data)
             response.raise_for_status()
             logger.info(f"Successfully updated notes for candidate {candidate_id}")
             return True
@@ -191,13 +374,71 @@ class CATSClient:
         endpoint = f"{self.base_url}/candidates/{candidate_id}/pipelines"
         
         try:
-            response = requests.get(endpoint, headers=self.headers)
+            response = self.session.get(endpoint)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Error fetching candidate pipelines: {e}")
             return None
     
+    def get_candidate_attachments(self, candidate_id):
+        """Get candidate's attachment records"""
+        return self._get_candidate_embedded(candidate_id, "attachments")
+    
+    def get_candidate_bundle(self, candidate_id, resources=("attachments", "tags", "pipelines")):
+        """Fetch several candidate sub-resources concurrently, keyed by resource name"""
+        if len(resources) == 1:
+            return {resources[0]: self._get_candidate_embedded(candidate_id, resources[0])}
+        
+        with ThreadPoolExecutor(max_workers=len(resources)) as executor:
+            results = executor.map(lambda resource: self._get_candidate_embedded(candidate_id, resource), resources)
+            return dict(zip(resources, results))
+    
+    def _get_candidate_embedded(self, candidate_id, resource):
+        """Get the _embedded list from /candidates/{id}/{resource}, or [] on error"""
+        endpoint = f"{self.base_url}/candidates/{candidate_id}/{resource}"
+        key = (candidate_id, resource)
+        
+        with self._embedded_cache_lock:
+            entry = self._embedded_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[2]
+        
+        try:
+            # Conditional GET: a 304 reuses the cached list without a response body
+            headers = {"If-None-Match": entry[1]} if entry and entry[1] else None
+            response = self.session.get(endpoint, headers=headers)
+            
+            if response.status_code == 304 and entry:
+                items, etag = entry[2], entry[1]
+            else:
+                response.raise_for_status()
+                items = response.json().get('_embedded', {}).get(resource, [])
+                etag = response.headers.get('ETag')
+            
+            self._cache_embedded(key, etag, items)
+            return items
+        except Exception as e:
+            logger.error(f"Error fetching candidate {resource}: {e}")
+            return []
+    
+    def _cache_embedded(self, key, etag, items):
+        """Store a sub-resource list for CATS_CACHE_TTL seconds"""
+        now = time.monotonic()
+        with self._embedded_cache_lock:
+            # Drop long-expired entries so the cache stays bounded
+            if len(self._embedded_cache) > 5000:
+                for stale in [k for k, v in self._embedded_cache.items() if v[0] < now - CATS_CACHE_TTL]:
+                    del self._embedded_cache[stale]
+            self._embedded_cache[key] = [now + CATS_CACHE_TTL, etag, items]
+    
+    def invalidate_candidate(self, candidate_id):
+        """Force the next attachments/tags/pipelines read for a candidate to revalidate with CATS"""
+        with self._embedded_cache_lock:
+            for key, entry in self._embedded_cache.items():
+                if key[0] == candidate_id:
+                    entry[0] = 0
+    
     def update_candidate_custom_field(self, candidate_id, field_id, value):
         """Update a specific custom field for a candidate"""
         endpoint = f"{self.base_url}/candidates/{candidate_id}/custom_fields/{field_id}"
@@ -207,7 +448,7 @@ class CATSClient:
         }
         
         try:
-            response = requests.put(endpoint, headers=self.headers, json=data)
+            response = self.session.put(endpoint, json=data)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -447,13 +447,11 @@ class ComprehensiveAttachmentProcessor:
                 # Render page to image with MUCH higher resolution
                 pix = page.get_pixmap(matrix=fitz.Matrix(4, 4))  # 4x scale for better detection
                 
-                # Save temporary high-res image
-                temp_path = os.path.join(output_dir, f"temp_page_{page_num + 1}.png")
-                pix.save(temp_path)
-                
-                # Open with PIL for enhancement
-                img = Image.open(temp_path)
-                
+                # Hand the rendered pixels straight to PIL instead of encoding a
+                # temporary PNG and decoding it again
+                mode = "RGBA" if pix.alpha else "RGB"
+                img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
                 # Enhance contrast to make subtle selections more visible
                 enhancer = ImageEnhance.Contrast(img)
                 img_enhanced = enhancer.enhance(1.5)  # Increase contrast
@@ -462,13 +460,11 @@ class ComprehensiveAttachmentProcessor:
                 sharpness = ImageEnhance.Sharpness(img_enhanced)
                 img_enhanced = sharpness.enhance(2.0)  # Sharpen image
                 
-                # Save enhanced image
+                # Save enhanced image - PNG is lossless so 'quality' does nothing;
+                # these pages are written once and read once, so favour fast zlib
                 output_path = os.path.join(output_dir, f"page_{page_num + 1}.png")
-                img_enhanced.save(output_path, 'PNG', quality=100)
-                
-                # Clean up temp file
-                os.remove(temp_path)
-                
+                img_enhanced.save(output_path, 'PNG', compress_level=1)
+
                 logger.info(f"Converted PDF page {page_num + 1} to {output_path} with 4x resolution and enhancement")
             
             pdf_doc.close()
@@ -6,7 +6,6 @@ Intelligent Candidate Processor - Extracts everything, filters by job requiremen
 import os
 import sys
 import logging
-import requests
 from typing import Dict, Any, Optional
 from datetime import datetime
 
@@ -17,6 +16,8 @@ from catsone.processors.dynamic_extraction_system import DynamicExtractionSystem
 from catsone.processors.job_requirements_extractor import JobRequirementsExtractor
 from catsone.processors.comprehensive_attachment_processor import ComprehensiveAttachmentProcessor
 from catsone.processors.ai_notes_formatter import AINotesFormatter
+from catsone.slack_config import slack_config
+from catsone.utils.slack_batcher import get_batcher
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,11 @@ class IntelligentCandidateProcessor:
         self.attachment_processor = ComprehensiveAttachmentProcessor()
         self.ai_formatter = AINotesFormatter()
         self.slack_webhook_url = os.getenv('SLACK_WEBHOOK_URL')
+        # Bursts of processed candidates go out as one Slack digest per channel instead of a post each;
+        # the batcher is shared process-wide, so processors built per webhook all feed the same queue
+        self.slack_batcher = None
+        if self.slack_webhook_url and self.slack_webhook_url != "your_slack_webhook_here":
+            self.slack_batcher = get_batcher(self.slack_webhook_url)
     
     def process_candidate_for_job(self, candidate_id: int, job_id: int) -> Dict[str, Any]:
         """Process candidate with job-specific filtering"""
@@ -216,7 +222,7 @@ class IntelligentCandidateProcessor:
     def _send_slack_notification(self, candidate_id: int, candidate_name: str, job_title: str, job_id: int):
         """Send Slack notification when AI notes are generated"""
         
-        if not self.slack_webhook_url or self.slack_webhook_url == "your_slack_webhook_here":
+        if not self.slack_batcher:
             logger.info("Slack webhook not configured, skipping notification")
             return
         
@@ -282,13 +288,10 @@ class IntelligentCandidateProcessor:
                 ]
             }
             
-            # Send to Slack
-            response = requests.post(self.slack_webhook_url, json=slack_message)
-            
-            if response.status_code == 200:
-                logger.info(f"Slack notification sent for candidate {candidate_id}")
-            else:
-                logger.error(f"Failed to send Slack notification: {response.status_code}")
+            # Queue for the next digest to this job's channel; posting happens off this thread
+            channel = slack_config.get_channel_for_job(job_title or '')
+            self.slack_batcher.enqueue(slack_message, channel=channel)
+            logger.info(f"Slack notification queued for candidate {candidate_id}")
                 
         except Exception as e:
             logger.error(f"Error sending Slack notification: {e}")
@@ -5,7 +5,12 @@ Uses Gemini Vision to detect actual checkmarks and selections from questionnaire
 """
 
 import os
+import io
+import json
+import hashlib
 import logging
+import tempfile
+import concurrent.futures
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import google.generativeai as genai
@@ -13,30 +18,206 @@ from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Pages are independent network-bound requests; cap in-flight calls to stay under Gemini's QPS limit
+MAX_PAGE_WORKERS = 8
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Pages sent together in one multi-image request, to save round-trips
+PAGES_PER_REQUEST = 4
+
+# Bounding box for page images sent to Gemini; scans beyond this only add vision tokens
+MAX_IMAGE_SIZE = (1536, 2048)
+IMAGE_JPEG_QUALITY = 85
+
+# Parsed page results keyed by image + prompt hash, so reruns and webhook replays skip the model
+VISION_CACHE_DIR = os.getenv('VISION_CACHE_DIR', '.vision_cache')
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Question categories in priority order: (keywords that must all appear, category)
+_CATEGORY_RULES = (
+    (('industries',), 'industries_worked'),
+    (('fast-paced',), 'fast_paced_comfort'),
+    (('physical', 'limitations'), 'physical_limitations'),
+    (('mining experience',), 'mining_experience'),
+    (('position', 'interested'), 'positions_interested'),
+    (('winter', 'gear'), 'weather_gear'),
+    (('rotational shifts',), 'rotational_shifts'),
+    (('service truck',), 'service_truck_sharing'),
+    (('background check',), 'background_check'),
+    (('drug', 'test'), 'drug_test'),
+    (('komatsu',), 'komatsu_experience'),
+    (('red seal',), 'red_seal'),
+    (('journeyman',), 'journeyman_license'),
+    (('underground', 'brands'), 'underground_brands'),
+    (('employment status',), 'employment_status'),
+    (('available to start',), 'start_availability'),
+    (('new opportunity',), 'reason_for_looking'),
+)
+
+# Detailed prompt for comprehensive vision analysis; identical for every page
+_VISION_PROMPT = """You are analyzing page of a filled questionnaire form. Extract EVERYTHING comprehensively.
+
+CRITICAL: PAY EXTREME ATTENTION TO RADIO BUTTONS AND CHECKMARKS!
+
+FOR RADIO BUTTONS (VERY IMPORTANT):
+- Look for SUBTLE differences between selected and unselected radio buttons
+- Selected radio button may appear as: filled circle (●), darker circle, circle with dot inside (⦿)
+- Unselected radio button appears as: empty circle (○)
+- IMPORTANT: In some forms, the difference is VERY SUBTLE - a slightly darker shade
+- Look for ANY visual difference in the radio button circles, even minimal shading
+
+FOR CHECKBOXES:
+- Empty checkbox: □ or ☐ (NOT selected)
+- Checked checkbox: ☑ or ☒ or ✓ or ✔ or X or filled square
+
+Only include items in "actual_selections" if they have a VISIBLE checkmark or selection!
+
+FOR EACH QUESTION ON THIS PAGE, provide:
+
+1. QUESTION DETAILS:
+   - Exact question number
+   - Complete question text (word for word)
+   - Question type (checkbox list, radio button, text field, dropdown, etc.)
+
+2. ALL AVAILABLE OPTIONS (VERY IMPORTANT):
+   - List EVERY checkbox option shown (whether checked or not)
+   - List EVERY radio button option shown
+   - List EVERY dropdown option if visible
+   - Include any "Other" or write-in options
+
+3. ACTUAL SELECTIONS (CRITICAL - LOOK CAREFULLY):
+   - For checkboxes: Look for ✓, ✔, X, or filled/darkened squares
+   - For radio buttons: Look for filled circles (●) vs empty circles (○)
+   - IMPORTANT: Only list options that have VISIBLE check marks or selections
+   - If a checkbox is empty/unchecked, do NOT include it in actual_selections
+   - For dropdowns: Note the displayed/selected value
+   - Include any text written in text fields
+
+4. EQUIPMENT-SPECIFIC EXTRACTION:
+   If the question involves equipment, machinery, or brands:
+   - List ALL equipment brands shown (CAT, Komatsu, John Deere, Hitachi, Volvo, etc.)
+   - List ALL equipment types shown (excavators, loaders, dozers, graders, etc.)
+   - Note which ones are SELECTED vs just available options
+   - Extract any written equipment experience details
+
+Return as detailed JSON:
+{
+    "page_type": "General Information / Legal / Skills / Employment / Preferences",
+    "candidate_name": "if visible",
+    "questions_and_responses": [
+        {
+            "question_number": "1",
+            "question_text": "Complete question text here",
+            "question_type": "checkbox_list",
+            "all_available_options": [
+                "Option 1 (whether checked or not)",
+                "Option 2 (whether checked or not)",
+                "Option 3 (whether checked or not)"
+            ],
+            "actual_selections": [
+                "Only the ones actually checked"
+            ],
+            "text_responses": ["Any text written"],
+            "equipment_specific": {
+                "is_equipment_question": true/false,
+                "equipment_brands_shown": ["CAT", "Komatsu", etc.],
+                "equipment_brands_selected": ["Only selected ones"],
+                "equipment_types_shown": ["Excavator", "Loader", etc.],
+                "equipment_types_selected": ["Only selected ones"]
+            }
+        }
+    ]
+}
+
+BE EXTREMELY THOROUGH. Extract every option shown, not just selected ones.
+"""
+
+# Prepended to _VISION_PROMPT when several pages share one request
+_BATCH_PROMPT_PREFIX = """You will receive {count} questionnaire page images, in page order.
+Apply the instructions below to EACH page separately.
+Return ONLY a JSON array of exactly {count} page objects, one per image in the same order,
+each following the JSON format described below.
+
+"""
+
+def _summarize_industries(selections, text, summary):
+    if selections:
+        summary['experience_highlights'].append(f"Industries: {', '.join(selections)}")
+
+def _summarize_red_seal(selections, text, summary):
+    if 'Yes' in selections:
+        summary['key_qualifications'].append('Red Seal Certified')
+
+def _summarize_journeyman(selections, text, summary):
+    if 'Yes' in selections:
+        summary['key_qualifications'].append('Journeyman Licensed')
+
+def _summarize_mining(selections, text, summary):
+    if 'Yes' in selections:
+        summary['experience_highlights'].append('Has mining experience')
+        if text:
+            summary['experience_highlights'].append(f"Mining comment: {', '.join(text)}")
+
+def _summarize_positions(selections, text, summary):
+    if selections:
+        summary['work_preferences'].append(f"Interested positions: {', '.join(selections[:3])}...")
+
+def _summarize_underground_brands(selections, text, summary):
+    if 'None' in str(selections):
+        summary['potential_concerns'].append('No underground machinery brand experience')
+    elif selections:
+        summary['experience_highlights'].append(f"Underground brands: {', '.join(selections)}")
+
+def _summarize_reason_for_looking(selections, text, summary):
+    if selections:
+        summary['work_preferences'].append(f"Reason for change: {', '.join(selections)}")
+
+# Question category -> summary handler(selections, text, summary)
+_SUMMARY_HANDLERS = {
+    'industries_worked': _summarize_industries,
+    'red_seal': _summarize_red_seal,
+    'journeyman_license': _summarize_journeyman,
+    'mining_experience': _summarize_mining,
+    'positions_interested': _summarize_positions,
+    'underground_brands': _summarize_underground_brands,
+    'reason_for_looking': _summarize_reason_for_looking,
+}
+
 class VisionQuestionnaireAnalyzer:
     """Analyze questionnaire images to detect actual selections and checkmarks"""
     
     def __init__(self, gemini_api_key: str):
         genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
+        # Flash handles most pages; Pro is only used when Flash's answer looks unusable
+        self.flash = genai.GenerativeModel('gemini-1.5-flash')
+        self.pro = genai.GenerativeModel('gemini-1.5-pro')
     
     def analyze_questionnaire_images(self, image_folder: str) -> Dict[str, Any]:
         """Analyze all questionnaire images to extract actual selections"""
         
         try:
-            # Get all image files
-            image_files = [f for f in os.listdir(image_folder) if f.endswith(('.png', '.jpg', '.jpeg'))]
-            image_files.sort()  # Ensure proper page order
+            # Get all image files, sorted to ensure proper page order
+            with os.scandir(image_folder) as entries:
+                image_files = sorted(
+                    e.name for e in entries
+                    if e.is_file() and e.name.lower().endswith(IMAGE_EXTENSIONS)
+                )
             
-            # Analyze each page
+            # Analyze batches of pages concurrently; map() keeps results in page order
             page_analyses = []
-            for image_file in image_files:
-                image_path = os.path.join(image_folder, image_file)
-                page_analysis = self._analyze_single_page(image_path)
-                page_analyses.append({
-                    'page': image_file,
-                    'analysis': page_analysis
-                })
+            if image_files:
+                image_paths = [os.path.join(image_folder, f) for f in image_files]
+                batches = [image_paths[i:i + PAGES_PER_REQUEST] for i in range(0, len(image_paths), PAGES_PER_REQUEST)]
+                workers = min(MAX_PAGE_WORKERS, len(batches))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = [page for batch in executor.map(self._analyze_page_batch, batches) for page in batch]
+                    for image_file, page_analysis in zip(image_files, results):
+                        page_analyses.append({
+                            'page': image_file,
+                            'analysis': page_analysis
+                        })
             
             # Combine all pages into complete profile
             complete_analysis = self._combine_page_analyses(page_analyses)
@@ -55,115 +236,171 @@ class VisionQuestionnaireAnalyzer:
     def _analyze_single_page(self, image_path: str) -> Dict[str, Any]:
         """Analyze a single page image to extract selections"""
         
-        try:
-            # Load the image
-            image = Image.open(image_path)
-            
-            # Create detailed prompt for comprehensive vision analysis
-            prompt = f"""
-            You are analyzing page of a filled questionnaire form. Extract EVERYTHING comprehensively.
-            
-            CRITICAL: PAY EXTREME ATTENTION TO RADIO BUTTONS AND CHECKMARKS!
-            
-            FOR RADIO BUTTONS (VERY IMPORTANT):
-            - Look for SUBTLE differences between selected and unselected radio buttons
-            - Selected radio button may appear as: filled circle (●), darker circle, circle with dot inside (⦿)
-            - Unselected radio button appears as: empty circle (○)
-            - IMPORTANT: In some forms, the difference is VERY SUBTLE - a slightly darker shade
-            - Look for ANY visual difference in the radio button circles, even minimal shading
-            
-            FOR CHECKBOXES:
-            - Empty checkbox: □ or ☐ (NOT selected)
-            - Checked checkbox: ☑ or ☒ or ✓ or ✔ or X or filled square
-            
-            Only include items in "actual_selections" if they have a VISIBLE checkmark or selection!
-
-            FOR EACH QUESTION ON THIS PAGE, provide:
-
-            1. QUESTION DETAILS:
-               - Exact question number
-               - Complete question text (word for word)
-               - Question type (checkbox list, radio button, text field, dropdown, etc.)
-
-            2. ALL AVAILABLE OPTIONS (VERY IMPORTANT):
-               - List EVERY checkbox option shown (whether checked or not)
-               - List EVERY radio button option shown
-               - List EVERY dropdown option if visible
-               - Include any "Other" or write-in options
-
-            3. ACTUAL SELECTIONS (CRITICAL - LOOK CAREFULLY):
-               - For checkboxes: Look for ✓, ✔, X, or filled/darkened squares
-               - For radio buttons: Look for filled circles (●) vs empty circles (○)
-               - IMPORTANT: Only list options that have VISIBLE check marks or selections
-               - If a checkbox is empty/unchecked, do NOT include it in actual_selections
-               - For dropdowns: Note the displayed/selected value
-               - Include any text written in text fields
-
-            4. EQUIPMENT-SPECIFIC EXTRACTION:
-               If the question involves equipment, machinery, or brands:
-               - List ALL equipment brands shown (CAT, Komatsu, John Deere, Hitachi, Volvo, etc.)
-               - List ALL equipment types shown (excavators, loaders, dozers, graders, etc.)
-               - Note which ones are SELECTED vs just available options
-               - Extract any written equipment experience details
-
-            Return as detailed JSON:
-            {{
-                "page_type": "General Information / Legal / Skills / Employment / Preferences",
-                "candidate_name": "if visible",
-                "questions_and_responses": [
-                    {{
-                        "question_number": "1",
-                        "question_text": "Complete question text here",
-                        "question_type": "checkbox_list",
-                        "all_available_options": [
-                            "Option 1 (whether checked or not)",
-                            "Option 2 (whether checked or not)",
-                            "Option 3 (whether checked or not)"
-                        ],
-                        "actual_selections": [
-                            "Only the ones actually checked"
-                        ],
-                        "text_responses": ["Any text written"],
-                        "equipment_specific": {{
-                            "is_equipment_question": true/false,
-                            "equipment_brands_shown": ["CAT", "Komatsu", etc.],
-                            "equipment_brands_selected": ["Only selected ones"],
-                            "equipment_types_shown": ["Excavator", "Loader", etc.],
-                            "equipment_types_selected": ["Only selected ones"]
-                        }}
-                    }}
-                ]
-            }}
-
-            BE EXTREMELY THOROUGH. Extract every option shown, not just selected ones.
-            """
+        return self._analyze_page_batch([image_path])[0]
+    
+    def _analyze_page_batch(self, image_paths: List[str]) -> List[Dict[str, Any]]:
+        """Analyze a few pages in one multi-image request, returning one result per page"""
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(image_paths)
+        pending = []
+        
+        for i, image_path in enumerate(image_paths):
+            try:
+                # Load the image, downscaled to grayscale JPEG
+                image = self._prepare_image(image_path)
+            except Exception as e:
+                logger.error(f"Error analyzing image {image_path}: {e}")
+                results[i] = {'error': str(e)}
+                continue
             
-            # Send to Gemini Vision
-            response = self.model.generate_content([prompt, image])
+            # Reuse an earlier analysis of the identical page
+            cache_key = self._cache_key(image['data'], _VISION_PROMPT)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, image, cache_key))
+        
+        # Send uncached pages to Flash together; a lone page goes through the single-page prompt
+        batch_results = None
+        if len(pending) > 1:
+            batch_results = self._analyze_batch_with_model([image for _, image, _ in pending], self.flash)
+        
+        for n, (i, image, cache_key) in enumerate(pending):
+            first_pass = batch_results[n] if batch_results else None
+            results[i] = self._finish_page(image_paths[i], image, cache_key, first_pass)
+        
+        return results
+    
+    def _finish_page(self, image_path: str, image: Dict[str, Any], cache_key: str,
+                     result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Complete one page: run Flash if needed, escalate to Pro if Flash misses, then cache"""
+        
+        try:
+            if result is None:
+                result = self._analyze_with_model(image, self.flash)
+            if self._needs_escalation(result):
+                logger.info(f"Escalating {image_path} to {self.pro.model_name}")
+                result = self._analyze_with_model(image, self.pro)
             
-            return self._parse_vision_response(response.text)
+            # Pro's answer is final even if a question is genuinely blank; only unparseable replies are retried
+            if not self._is_malformed(result):
+                self._cache_set(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error analyzing image {image_path}: {e}")
             return {'error': str(e)}
     
+    def _analyze_batch_with_model(self, images: List[Dict[str, Any]], model) -> Optional[List[Dict[str, Any]]]:
+        """Run the vision prompt on several pages at once; None if the reply can't be split per page"""
+        
+        prompt = _BATCH_PROMPT_PREFIX.format(count=len(images)) + _VISION_PROMPT
+        try:
+            response = model.generate_content([prompt, *images])
+            text = response.text
+        except Exception as e:
+            logger.warning(f"Batch vision request for {len(images)} pages failed, falling back to single pages: {e}")
+            return None
+        
+        # The array must be top-level: a '[' after the first '{' belongs inside a page object
+        start = text.find('[')
+        brace = text.find('{')
+        if start != -1 and (brace == -1 or start < brace):
+            try:
+                pages, _ = _JSON_DECODER.raw_decode(text, start)
+            except ValueError:
+                pages = None
+            if isinstance(pages, list) and len(pages) == len(images) and all(isinstance(p, dict) for p in pages):
+                return pages
+        
+        logger.warning(f"Batch vision response did not contain {len(images)} page objects, falling back to single pages")
+        return None
+    
+    def _analyze_with_model(self, image: Dict[str, Any], model) -> Dict[str, Any]:
+        """Run the vision prompt on one prepared page with the given model"""
+        
+        response = model.generate_content([_VISION_PROMPT, image])
+        return self._parse_vision_response(response.text)
+    
+    def _is_malformed(self, result: Dict[str, Any]) -> bool:
+        """True when the model's reply couldn't be parsed into a page result"""
+        
+        return 'parse_error' in result or 'vision_analysis' in result
+    
+    def _needs_escalation(self, result: Dict[str, Any]) -> bool:
+        """True when a page result is malformed or shows options with nothing selected"""
+        
+        if self._is_malformed(result):
+            return True
+        
+        for q in result.get('questions_and_responses', []):
+            if q.get('all_available_options') and not q.get('actual_selections') and not q.get('text_responses'):
+                return True
+        return False
+    
+    def _prepare_image(self, image_path: str) -> Dict[str, Any]:
+        """Shrink a page scan to MAX_IMAGE_SIZE and re-encode it as grayscale JPEG"""
+        
+        with Image.open(image_path) as image:
+            image.thumbnail(MAX_IMAGE_SIZE, Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.convert('L').save(buffer, 'JPEG', quality=IMAGE_JPEG_QUALITY, optimize=True)
+        
+        return {'mime_type': 'image/jpeg', 'data': buffer.getvalue()}
+    
+    def _cache_key(self, image_data: bytes, prompt: str) -> str:
+        """Hash the page image together with the prompt and the models that may analyze it"""
+        
+        digest = hashlib.sha256(image_data)
+        digest.update(prompt.encode('utf-8'))
+        for model in (self.flash, self.pro):
+            digest.update(model.model_name.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached page analysis, or None on a miss"""
+        
+        path = os.path.join(VISION_CACHE_DIR, f"{key}.json")
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _cache_set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a page analysis atomically so concurrent pages never see a partial file"""
+        
+        try:
+            os.makedirs(VISION_CACHE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=VISION_CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, os.path.join(VISION_CACHE_DIR, f"{key}.json"))
+        except OSError as e:
+            logger.warning(f"Could not write vision cache entry {key}: {e}")
+    
     def _parse_vision_response(self, response_text: str) -> Dict[str, Any]:
         """Parse Gemini Vision response"""
         
-        try:
-            import json
-            import re
-            
-            # Try to extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+        # Decode the first JSON object in the response, skipping any prose or ``` fences around it
+        start = response_text.find('{')
+        error = None
+        while start != -1:
+            try:
+                result, _ = _JSON_DECODER.raw_decode(response_text, start)
+            except ValueError as e:
+                error = error or e
             else:
-                # If no JSON, parse as text
-                return {'vision_analysis': response_text}
-                
-        except Exception as e:
-            return {'vision_response': response_text, 'parse_error': str(e)}
+                if isinstance(result, dict):
+                    return result
+            start = response_text.find('{', start + 1)
+        
+        if error is not None:
+            return {'vision_response': response_text, 'parse_error': str(error)}
+        
+        # If no JSON, parse as text
+        return {'vision_analysis': response_text}
     
     def _combine_page_analyses(self, page_analyses: List[Dict]) -> Dict[str, Any]:
         """Combine all page analyses into complete candidate profile"""
@@ -172,15 +409,15 @@ class VisionQuestionnaireAnalyzer:
             'candidate_info': {},
             'actual_responses': {},
             'response_summary': {},
-            'equipment_analysis': {
-                'brands_available': [],
-                'brands_selected': [],
-                'equipment_types_available': [],
-                'equipment_types_selected': [],
-                'equipment_gaps': []
-            }
+            'equipment_analysis': {}
         }
         
+        # Ordered sets (dict keys) so duplicates across pages collapse as they arrive
+        brands_available = {}
+        brands_selected = {}
+        types_available = {}
+        types_selected = {}
+        
         for page_data in page_analyses:
             analysis = page_data.get('analysis', {})
             
@@ -197,7 +434,8 @@ class VisionQuestionnaireAnalyzer:
                 text_responses = q.get('text_responses', [])
                 
                 # Store actual responses
-                response_key = f"q{question_num}_{self._categorize_question(question_text)}"
+                text_lower = (question_text or '').lower()
+                response_key = f"q{question_num}_{self._categorize_question(text_lower)}"
                 combined['actual_responses'][response_key] = {
                     'question': question_text,
                     'selections': actual_selections,
@@ -210,79 +448,38 @@ class VisionQuestionnaireAnalyzer:
                 equipment_data = q.get('equipment_specific', {})
                 if equipment_data.get('is_equipment_question'):
                     # Collect available brands/types
-                    brands_shown = equipment_data.get('equipment_brands_shown', [])
-                    combined['equipment_analysis']['brands_available'].extend(brands_shown)
-                    
-                    types_shown = equipment_data.get('equipment_types_shown', [])
-                    combined['equipment_analysis']['equipment_types_available'].extend(types_shown)
+                    brands_available.update(dict.fromkeys(equipment_data.get('equipment_brands_shown', [])))
+                    types_available.update(dict.fromkeys(equipment_data.get('equipment_types_shown', [])))
                     
                     # Collect selected brands/types
-                    brands_selected = equipment_data.get('equipment_brands_selected', [])
-                    combined['equipment_analysis']['brands_selected'].extend(brands_selected)
-                    
-                    types_selected = equipment_data.get('equipment_types_selected', [])
-                    combined['equipment_analysis']['equipment_types_selected'].extend(types_selected)
-        
-        # Remove duplicates from equipment lists
-        for key in combined['equipment_analysis']:
-            if isinstance(combined['equipment_analysis'][key], list):
-                combined['equipment_analysis'][key] = list(set(combined['equipment_analysis'][key]))
+                    brands_selected.update(dict.fromkeys(equipment_data.get('equipment_brands_selected', [])))
+                    types_selected.update(dict.fromkeys(equipment_data.get('equipment_types_selected', [])))
         
-        # Calculate equipment gaps
-        combined['equipment_analysis']['equipment_gaps'] = [
-            brand for brand in combined['equipment_analysis']['brands_available']
-            if brand not in combined['equipment_analysis']['brands_selected']
-        ]
+        combined['equipment_analysis'] = {
+            'brands_available': list(brands_available),
+            'brands_selected': list(brands_selected),
+            'equipment_types_available': list(types_available),
+            'equipment_types_selected': list(types_selected),
+            # Brands offered on the form but not selected
+            'equipment_gaps': [brand for brand in brands_available if brand not in brands_selected]
+        }
         
         # Create summary
         combined['response_summary'] = self._create_response_summary(combined['actual_responses'])
         
         return combined
     
-    def _categorize_question(self, question_text: str) -> str:
-        """Categorize question for easier reference"""
+    def _categorize_question(self, text_lower: str) -> str:
+        """Categorize an already-lowercased question for easier reference"""
         
-        if not question_text:
+        if not text_lower:
             return 'unknown'
         
-        text_lower = question_text.lower()
-        
-        if 'industries' in text_lower:
-            return 'industries_worked'
-        elif 'fast-paced' in text_lower:
-            return 'fast_paced_comfort'
-        elif 'physical' in text_lower and 'limitations' in text_lower:
-            return 'physical_limitations'
-        elif 'mining experience' in text_lower:
-            return 'mining_experience'
-        elif 'position' in text_lower and 'interested' in text_lower:
-            return 'positions_interested'
-        elif 'winter' in text_lower and 'gear' in text_lower:
-            return 'weather_gear'
-        elif 'rotational shifts' in text_lower:
-            return 'rotational_shifts'
-        elif 'service truck' in text_lower:
-            return 'service_truck_sharing'
-        elif 'background check' in text_lower:
-            return 'background_check'
-        elif 'drug' in text_lower and 'test' in text_lower:
-            return 'drug_test'
-        elif 'komatsu' in text_lower:
-            return 'komatsu_experience'
-        elif 'red seal' in text_lower:
-            return 'red_seal'
-        elif 'journeyman' in text_lower:
-            return 'journeyman_license'
-        elif 'underground' in text_lower and 'brands' in text_lower:
-            return 'underground_brands'
-        elif 'employment status' in text_lower:
-            return 'employment_status'
-        elif 'available to start' in text_lower:
-            return 'start_availability'
-        elif 'new opportunity' in text_lower:
-            return 'reason_for_looking'
-        else:
-            return 'other'
+        # First rule whose keywords all appear wins
+        for keywords, category in _CATEGORY_RULES:
+            if all(keyword in text_lower for keyword in keywords):
+                return category
+        return 'other'
     
     def _create_response_summary(self, responses: Dict[str, Any]) -> Dict[str, Any]:
         """Create human-readable summary of actual responses"""
@@ -295,35 +492,10 @@ class VisionQuestionnaireAnalyzer:
         }
         
         for key, response in responses.items():
-            selections = response.get('selections', [])
-            text = response.get('text', [])
-            
-            # Process based on question type
-            if 'industries_worked' in key and selections:
-                summary['experience_highlights'].append(f"Industries: {', '.join(selections)}")
-            
-            elif 'red_seal' in key and 'Yes' in selections:
-                summary['key_qualifications'].append('Red Seal Certified')
-            
-            elif 'journeyman' in key and 'Yes' in selections:
-                summary['key_qualifications'].append('Journeyman Licensed')
-            
-            elif 'mining_experience' in key and 'Yes' in selections:
-                summary['experience_highlights'].append('Has mining experience')
-                if text:
-                    summary['experience_highlights'].append(f"Mining comment: {', '.join(text)}")
-            
-            elif 'positions_interested' in key and selections:
-                summary['work_preferences'].append(f"Interested positions: {', '.join(selections[:3])}...")
-            
-            elif 'underground_brands' in key:
-                if 'None' in str(selections):
-                    summary['potential_concerns'].append('No underground machinery brand experience')
-                elif selections:
-                    summary['experience_highlights'].append(f"Underground brands: {', '.join(selections)}")
-            
-            elif 'reason_for_looking' in key and selections:
-                summary['work_preferences'].append(f"Reason for change: {', '.join(selections)}")
+            # Keys are q{number}_{category}; dispatch on the category
+            handler = _SUMMARY_HANDLERS.get(key.split('_', 1)[-1])
+            if handler:
+                handler(response.get('selections', []), response.get('text', []), summary)
         
         return summary
 
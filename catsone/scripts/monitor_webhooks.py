@@ -3,49 +3,63 @@
 Monitor all webhook activity in real-time
 """
 
+import os
 import time
-import subprocess
-import json
+
+LOG_FILE = 'webhook_live.log'
+
+def print_line(line):
+    """Highlight important lines"""
+    if 'Received webhook' in line:
+        print(f"\n🔔 {line}")
+    elif 'candidate_id' in line:
+        print(f"   📋 {line}")
+    elif 'POST /webhook/' in line:
+        endpoint = line.split('POST ')[1].split(' ')[0]
+        print(f"\n📮 Webhook hit: {endpoint}")
+    elif 'ERROR' in line:
+        print(f"   ❌ {line}")
+    elif 'Successfully processed' in line:
+        print(f"   ✅ {line}")
+    else:
+        print(f"   {line}")
 
 print("Monitoring webhook activity...")
 print("="*60)
 
-last_size = 0
+log = None
 while True:
     try:
-        # Get file size
-        result = subprocess.run(['wc', '-l', 'webhook_live.log'], capture_output=True, text=True)
-        current_size = int(result.stdout.split()[0])
+        if log is None:
+            # Open once and start at the end, like tail -f
+            log = open(LOG_FILE, 'rb')
+            log.seek(0, os.SEEK_END)
         
-        if current_size > last_size:
-            # New lines added
-            new_lines = current_size - last_size
-            result = subprocess.run(['tail', f'-n{new_lines}', 'webhook_live.log'], capture_output=True, text=True)
-            
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    # Highlight important lines
-                    if 'Received webhook' in line:
-                        print(f"\n🔔 {line}")
-                    elif 'candidate_id' in line:
-                        print(f"   📋 {line}")
-                    elif 'POST /webhook/' in line:
-                        endpoint = line.split('POST ')[1].split(' ')[0]
-                        print(f"\n📮 Webhook hit: {endpoint}")
-                    elif 'ERROR' in line:
-                        print(f"   ❌ {line}")
-                    elif 'Successfully processed' in line:
-                        print(f"   ✅ {line}")
-                    else:
-                        print(f"   {line}")
-            
-            last_size = current_size
+        line = log.readline()
+        if line.endswith(b'\n'):
+            line = line.decode('utf-8', errors='replace').rstrip('\n')
+            if line:
+                print_line(line)
+            continue
         
-        time.sleep(1)
+        # Partial or no new data: rewind to the line start and wait for more
+        log.seek(-len(line), os.SEEK_CUR)
+        
+        # Log was truncated or rotated; reopen from the top
+        stat = os.stat(LOG_FILE)
+        if stat.st_size < log.tell() or stat.st_ino != os.fstat(log.fileno()).st_ino:
+            # Open the new file before letting go of the old one, so a failed open changes nothing
+            rotated = open(LOG_FILE, 'rb')
+            log.close()
+            log = rotated
+        
+        time.sleep(0.2)
         
     except KeyboardInterrupt:
         print("\nMonitoring stopped.")
         break
     except Exception as e:
+        # Keep the open handle: its offset is exactly where reading stopped, and holding the
+        # old inode open means a rotation meanwhile is still detected and read from the top
         print(f"Error: {e}")
-        time.sleep(1)
\ No newline at end of file
+        time.sleep(1)
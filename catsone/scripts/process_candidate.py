@@ -7,17 +7,14 @@ Processes candidates from CATS with questionnaire analysis
 import sys
 import os
 import logging
+from pathlib import Path
 from datetime import datetime
 
 sys.path.append('/home/gotime2022/recruitment_ops')
 from catsone.integration.cats_integration import CATSClient
 from catsone.processors.intelligent_candidate_processor import IntelligentCandidateProcessor
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = logging.getLogger(__name__)
 
 def process_candidate_from_cats(candidate_id: int, job_id: int):
     """
@@ -54,26 +51,28 @@ def process_candidate_from_cats(candidate_id: int, job_id: int):
             print(result['notes'])
             print("=" * 70)
             
-            # Save results
-            filename = f"candidate_{candidate_id}_processed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-            with open(filename, 'w') as f:
-                f.write(f"CANDIDATE PROCESSING RESULTS\n")
-                f.write(f"{'=' * 70}\n\n")
-                f.write(f"Candidate: {result['candidate_name']} (ID: {candidate_id})\n")
-                f.write(f"Job: {result['job_title']} (ID: {job_id})\n")
-                f.write(f"Processed: {datetime.now()}\n\n")
-                f.write("NOTES:\n")
-                f.write("-" * 30 + "\n")
-                f.write(result['notes'])
+            # Save results in a single write
+            processed_at = datetime.now()
+            filename = f"candidate_{candidate_id}_processed_{processed_at.strftime('%Y%m%d_%H%M%S')}.txt"
+            report = (
+                f"CANDIDATE PROCESSING RESULTS\n"
+                f"{'=' * 70}\n\n"
+                f"Candidate: {result['candidate_name']} (ID: {candidate_id})\n"
+                f"Job: {result['job_title']} (ID: {job_id})\n"
+                f"Processed: {processed_at}\n\n"
+                f"NOTES:\n"
+                f"{'-' * 30}\n"
+                f"{result['notes']}"
+            )
+            Path(filename).write_text(report)
             
             print(f"\n💾 Results saved to: {filename}")
             
         else:
             print(f"\n❌ FAILED: {result.get('error')}")
             
-    except Exception as e:
-        logging.error(f"Error processing candidate: {e}")
-        print(f"\n❌ Error: {e}")
+    except Exception:
+        logger.exception("Error processing candidate %s", candidate_id)
 
 def main():
     """Main entry point"""
@@ -90,4 +89,9 @@ def main():
     process_candidate_from_cats(candidate_id, job_id)
 
 if __name__ == "__main__":
+    # Configure logging only when run as a script, so importers keep their own config
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     main()
\ No newline at end of file
@@ -4,12 +4,17 @@ Simple webhook handler for CATS events
 Processes candidates when questionnaires are added or status changes
 """
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, BackgroundTasks, Depends
 from fastapi.responses import JSONResponse
 import os
 import sys
+import re
 import json
+import hashlib
+import hmac
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 import uvicorn
@@ -29,90 +34,229 @@ else:
     print(f"✓ Loaded ANTHROPIC_API_KEY: {ANTHROPIC_KEY[:20]}...")
 
 sys.path.append('/home/gotime2022/recruitment_ops')
+from catsone.config import WEBHOOK_SECRET
 from catsone.integration.cats_integration import CATSClient
 from catsone.processors.intelligent_candidate_processor import IntelligentCandidateProcessor
+from catsone.utils.webhook_state import WebhookState
 
 app = FastAPI()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize clients
-cats_client = CATSClient()
-processor = IntelligentCandidateProcessor()
+@app.on_event('startup')
+def init_clients():
+    """Build clients per worker and open the CATS connection pool before serving traffic"""
+    app.state.cats = CATSClient()
+    app.state.cats.warmup()
+    app.state.processor = IntelligentCandidateProcessor()
+
+def get_cats(request: Request) -> CATSClient:
+    """Dependency: the worker's shared CATS client"""
+    return request.app.state.cats
+
+def get_processor(request: Request) -> IntelligentCandidateProcessor:
+    """Dependency: the worker's shared candidate processor"""
+    return request.app.state.processor
+
+# "Recruiting - Dayforce" exports (either word order) and other questionnaire-like filenames
+_QUESTIONNAIRE_FILE_RE = re.compile(r'recruiting.*dayforce|dayforce.*recruiting|questionnaire|form|assessment', re.I | re.S)
+
+# Questionnaire-related tags, matched anywhere in the tag title
+_QUESTIONNAIRE_TAG_RE = re.compile('|'.join(map(re.escape, [
+    'questionnaire ready',
+    'has questionnaire',
+    'questionnaire uploaded',
+    'application status: questionnaire completed',
+    'questionnaire completed'
+])), re.I)
+
+# CATS retries deliveries and several triggers fire for one change; ignore repeats inside this window
+DEDUPE_TTL = int(os.getenv('WEBHOOK_DEDUPE_TTL', 300))
+
+# Dedupe keys and candidate locks live in SQLite (WEBHOOK_STATE_DB) so every worker process shares them
+_state = None
+_state_guard = threading.Lock()
+
+# Candidates found without a questionnaire skip further webhooks for this long,
+# unless an attachment/tag change or a trigger status arrives in the meantime
+NO_QUESTIONNAIRE_TTL = int(os.getenv('NO_QUESTIONNAIRE_TTL', 60))
+_QUESTIONNAIRE_EVENT_RE = re.compile(r'attachment|tag', re.I)
+
+def event_key(event_type, candidate_id, data):
+    """Stable dedupe key for one webhook delivery
+    
+    CATS's delivery_id identifies a redelivery exactly. Without one, only a byte-for-byte
+    repeat of the payload (same event timestamp included) counts as the same delivery, so a
+    genuine second update for the candidate is never mistaken for a duplicate.
+    """
+    delivery_id = data.get('delivery_id')
+    if delivery_id:
+        identity = f"delivery:{delivery_id}"
+    else:
+        timestamp = data.get('timestamp') or data.get('date_modified') or data.get('date_created') or ''
+        payload = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+        identity = f"payload:{timestamp}:{payload}"
+    return hashlib.blake2b(f"{event_type}:{candidate_id}:{identity}".encode(), digest_size=16).hexdigest()
+
+def webhook_state():
+    """The process's handle on the shared webhook state, opened on first use"""
+    global _state
+    with _state_guard:
+        if _state is None:
+            _state = WebhookState()
+        return _state
+
+def _state_key(key):
+    """Tuple keys like ('processed', candidate_id, job_id) flattened to a string"""
+    return key if isinstance(key, str) else ':'.join(map(str, key))
+
+def seen_recently(key):
+    """True if key was marked within its TTL by any worker"""
+    return webhook_state().seen(_state_key(key))
+
+def mark_seen(key, ttl=DEDUPE_TTL):
+    """Remember key for ttl seconds (DEDUPE_TTL by default)"""
+    webhook_state().mark(_state_key(key), ttl)
+
+def claim(key, ttl=DEDUPE_TTL):
+    """Mark key unless another delivery already did; False means this one is a duplicate"""
+    return webhook_state().claim(_state_key(key), ttl)
+
+def forget(key):
+    """Drop key so the next seen_recently check misses"""
+    webhook_state().forget(_state_key(key))
+
+# One processing run per candidate at a time. Threads in this process queue on a local lock;
+# the SQLite lease then keeps other worker processes out.
+_candidate_locks = {}  # candidate_id -> [lock, users]
+_candidate_locks_guard = threading.Lock()
+
+@contextmanager
+def candidate_lock(candidate_id):
+    """Serialize processing for one candidate across background tasks and workers"""
+    with _candidate_locks_guard:
+        entry = _candidate_locks.setdefault(candidate_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0], webhook_state().lock(f"candidate:{candidate_id}"):
+            yield
+    finally:
+        with _candidate_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _candidate_locks[candidate_id]
+
+def verify_signature(body, signature):
+    """Check the X-CATS-Signature HMAC-SHA256 of the raw body; always passes when no secret is configured"""
+    if not WEBHOOK_SECRET:
+        return True
+    if not signature:
+        return False
+    expected = hmac.new(WEBHOOK_SECRET.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def cats_unavailable_response(cats):
+    """503 asking CATS to redeliver later while our circuit to its API is open"""
+    retry_after = cats.adapter.retry_after()
+    logger.warning(f"CATS circuit open, deferring webhook for {retry_after}s")
+    return JSONResponse(
+        {'error': 'CATS API unavailable'},
+        status_code=503,
+        headers={'Retry-After': str(retry_after)}
+    )
 
 @app.post('/webhook/candidate')
-async def handle_candidate_webhook(request: Request):
+async def handle_candidate_webhook(request: Request, background_tasks: BackgroundTasks,
+                                   cats: CATSClient = Depends(get_cats),
+                                   processor: IntelligentCandidateProcessor = Depends(get_processor)):
     """Handle candidate.updated and candidate.created webhooks"""
     
     try:
-        data = await request.json()
-        logger.info(f"Received webhook: {json.dumps(data, indent=2)}")
+        # Reject forged or misrouted deliveries before parsing or touching CATS
+        body = await request.body()
+        if not verify_signature(body, request.headers.get('X-CATS-Signature')):
+            logger.warning("Rejected candidate webhook with invalid signature")
+            return JSONResponse({'error': 'Invalid signature'}, status_code=401)
+        data = json.loads(body)
         
         event_type = data.get('event')
         candidate_id = data.get('candidate_id') or data.get('id')
+        logger.info("Received webhook: %s for candidate %s", event_type, candidate_id)
+        
+        # Only serialize the full payload when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Full webhook payload: %s", json.dumps(data, indent=2))
         
         if not candidate_id:
             return JSONResponse({'error': 'No candidate ID found'}, status_code=400)
         
+        # Short-circuit redeliveries of the same event
+        key = event_key(event_type, candidate_id, data)
+        if seen_recently(key):
+            logger.info(f"Duplicate {event_type} webhook for candidate {candidate_id}, skipping")
+            return JSONResponse({'status': 'duplicate', 'candidate_id': candidate_id})
+        
+        # Shed load instead of queueing work that can't reach CATS
+        if cats.adapter.is_open():
+            return cats_unavailable_response(cats)
+        # Atomic across workers: a redelivery racing this one on another worker loses here
+        if not claim(key):
+            logger.info(f"Duplicate {event_type} webhook for candidate {candidate_id}, skipping")
+            return JSONResponse({'status': 'duplicate', 'candidate_id': candidate_id})
+        
         # Check if webhook is tag-related
         if 'tag' in str(data).lower() or 'tags' in data:
             logger.info("Tag-related webhook detected")
         
-        # Check if candidate has questionnaire tag or attachment
-        has_questionnaire_tag = check_for_questionnaire_tag(candidate_id)
-        has_questionnaire = has_questionnaire_tag or check_for_questionnaire(candidate_id)
-        
-        if has_questionnaire:
-            logger.info(f"Questionnaire found for candidate {candidate_id} (tag: {has_questionnaire_tag})")
-            
-            # Get job ID (might be in webhook data or need to fetch)
-            job_id = data.get('job_id') or get_candidate_job_id(candidate_id)
-            
-            if job_id:
-                # Process the candidate
-                result = processor.process_candidate_for_job(candidate_id, job_id)
-                
-                if result.get('success'):
-                    logger.info(f"Successfully processed candidate {candidate_id}")
-                    return JSONResponse({
-                        'status': 'success',
-                        'candidate_id': candidate_id,
-                        'message': 'Candidate processed successfully'
-                    })
-                else:
-                    logger.error(f"Failed to process: {result.get('error')}")
-                    return JSONResponse({
-                        'status': 'error',
-                        'error': result.get('error')
-                    }, status_code=500)
-            else:
-                logger.warning(f"No job ID found for candidate {candidate_id}")
-                return JSONResponse({
-                    'status': 'skipped',
-                    'reason': 'No job associated with candidate'
-                })
-        else:
-            logger.info(f"No questionnaire found for candidate {candidate_id}")
+        # Attachment/tag changes may bring the questionnaire; anything else for a
+        # candidate we just checked would only repeat the same CATS lookups
+        no_questionnaire_key = ('no_questionnaire', candidate_id)
+        if _QUESTIONNAIRE_EVENT_RE.search(event_type or '') or 'tags' in data:
+            forget(no_questionnaire_key)
+        elif seen_recently(no_questionnaire_key):
+            logger.info(f"Candidate {candidate_id} had no questionnaire recently, skipping")
             return JSONResponse({
                 'status': 'skipped',
-                'reason': 'No questionnaire attachment or tag found'
+                'reason': 'no_questionnaire',
+                'candidate_id': candidate_id
             })
+        
+        # The candidate changed, so cached attachments/tags/pipelines must be revalidated
+        cats.invalidate_candidate(candidate_id)
+        
+        # Acknowledge now; CATS lookups and processing run after the response is sent
+        background_tasks.add_task(process_candidate_event, cats, processor, candidate_id, data.get('job_id'))
+        return JSONResponse({
+            'status': 'accepted',
+            'candidate_id': candidate_id
+        }, status_code=202)
             
     except Exception as e:
         logger.error(f"Webhook error: {e}")
         return JSONResponse({'error': str(e)}, status_code=500)
 
 @app.post('/webhook/pipeline')
-async def handle_pipeline_webhook(request: Request):
+async def handle_pipeline_webhook(request: Request, background_tasks: BackgroundTasks,
+                                  cats: CATSClient = Depends(get_cats),
+                                  processor: IntelligentCandidateProcessor = Depends(get_processor)):
     """Handle pipeline status changes"""
     
     try:
-        data = await request.json()
-        logger.info(f"Pipeline webhook: {json.dumps(data, indent=2)}")
+        # Reject forged or misrouted deliveries before parsing or touching CATS
+        body = await request.body()
+        if not verify_signature(body, request.headers.get('X-CATS-Signature')):
+            logger.warning("Rejected pipeline webhook with invalid signature")
+            return JSONResponse({'error': 'Invalid signature'}, status_code=401)
+        data = json.loads(body)
         
         # Extract candidate and new status/list
         candidate_id = data.get('candidate_id')
         new_status = data.get('status') or data.get('stage')
+        logger.info("Pipeline webhook: candidate %s status %s", candidate_id, new_status)
+        
+        # Only serialize the full payload when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Full webhook payload: %s", json.dumps(data, indent=2))
         
         # Define which statuses trigger processing
         trigger_statuses = [
@@ -128,39 +272,32 @@ async def handle_pipeline_webhook(request: Request):
         trigger_statuses_lower = [s.lower() for s in trigger_statuses]
         
         if status_lower in trigger_statuses_lower:
+            # Short-circuit redeliveries of the same status change
+            key = event_key(f"pipeline:{status_lower}", candidate_id, data)
+            if seen_recently(key):
+                logger.info(f"Duplicate pipeline webhook for candidate {candidate_id}, skipping")
+                return JSONResponse({'status': 'duplicate', 'candidate_id': candidate_id})
+            
+            # Shed load instead of queueing work that can't reach CATS
+            if cats.adapter.is_open():
+                return cats_unavailable_response(cats)
+            # Atomic across workers: a redelivery racing this one on another worker loses here
+            if not claim(key):
+                logger.info(f"Duplicate pipeline webhook for candidate {candidate_id}, skipping")
+                return JSONResponse({'status': 'duplicate', 'candidate_id': candidate_id})
+            
             logger.info(f"Status '{new_status}' matches trigger - processing candidate {candidate_id}")
             
-            # Check and process if has questionnaire
-            if check_for_questionnaire(candidate_id):
-                logger.info(f"Questionnaire found for candidate {candidate_id}")
-                job_id = get_candidate_job_id(candidate_id)
-                
-                if job_id:
-                    logger.info(f"Processing candidate {candidate_id} for job {job_id}")
-                    result = processor.process_candidate_for_job(candidate_id, job_id)
-                    
-                    if result.get('success'):
-                        logger.info(f"✅ Successfully processed candidate {candidate_id}")
-                    else:
-                        logger.error(f"❌ Failed to process candidate {candidate_id}: {result.get('error')}")
-                    
-                    return JSONResponse({
-                        'status': 'processed' if result.get('success') else 'failed',
-                        'candidate_id': candidate_id,
-                        'message': result.get('notes', '') if result.get('success') else result.get('error')
-                    })
-                else:
-                    logger.warning(f"No job ID found for candidate {candidate_id}")
-                    return JSONResponse({
-                        'status': 'error',
-                        'message': 'No job associated with candidate'
-                    })
-            else:
-                logger.info(f"No questionnaire found for candidate {candidate_id}")
-                return JSONResponse({
-                    'status': 'skipped',
-                    'message': 'No questionnaire attachment found'
-                })
+            # Pipelines changed, so cached candidate data and the no-questionnaire verdict must be revalidated
+            cats.invalidate_candidate(candidate_id)
+            forget(('no_questionnaire', candidate_id))
+            
+            # Acknowledge now; processing runs after the response is sent
+            background_tasks.add_task(process_pipeline_event, cats, processor, candidate_id)
+            return JSONResponse({
+                'status': 'accepted',
+                'candidate_id': candidate_id
+            }, status_code=202)
         
         return JSONResponse({'status': 'no_action_needed'})
         
@@ -168,73 +305,125 @@ async def handle_pipeline_webhook(request: Request):
         logger.error(f"Pipeline webhook error: {e}")
         return JSONResponse({'error': str(e)}, status_code=500)
 
-def check_for_questionnaire(candidate_id):
-    """Check if candidate has questionnaire attachment"""
+def process_candidate_event(cats, processor, candidate_id, job_id=None):
+    """Background task: check for a questionnaire, find the job and process the candidate"""
     try:
-        attachments = cats_client.get_candidate_attachments(candidate_id)
+        # One round-trip for tags, attachments and (unless the webhook named a job) pipelines
+        resources = ('attachments', 'tags') if job_id else ('attachments', 'tags', 'pipelines')
+        bundle = cats.get_candidate_bundle(candidate_id, resources)
         
-        for attachment in attachments:
-            filename = attachment.get('filename', '').lower()
-            # Check for "Recruiting - Dayforce" pattern
-            if 'recruiting' in filename and 'dayforce' in filename:
-                return True
-            # Also check for other questionnaire patterns
-            if any(keyword in filename for keyword in ['questionnaire', 'form', 'assessment']):
-                return True
-        return False
-    except:
-        return False
+        # Check if candidate has questionnaire tag or attachment
+        has_questionnaire_tag = check_for_questionnaire_tag(candidate_id, bundle['tags'])
+        has_questionnaire = has_questionnaire_tag or check_for_questionnaire(candidate_id, bundle['attachments'])
+        
+        if not has_questionnaire:
+            logger.info(f"No questionnaire found for candidate {candidate_id}")
+            mark_seen(('no_questionnaire', candidate_id), NO_QUESTIONNAIRE_TTL)
+            return
+        
+        logger.info(f"Questionnaire found for candidate {candidate_id} (tag: {has_questionnaire_tag})")
+        forget(('no_questionnaire', candidate_id))
+        
+        # Get job ID (might be in webhook data or need to fetch)
+        job_id = job_id or get_candidate_job_id(candidate_id, bundle['pipelines'])
+        if not job_id:
+            logger.warning(f"No job ID found for candidate {candidate_id}")
+            return
+        
+        # Wait out any run already in flight, then skip if it covered this job
+        with candidate_lock(candidate_id):
+            # A different trigger may already have processed this candidate for this job
+            processed_key = ('processed', candidate_id, job_id)
+            if seen_recently(processed_key):
+                logger.info(f"Candidate {candidate_id} already processed for job {job_id}, skipping")
+                return
+            
+            # Process the candidate
+            result = processor.process_candidate_for_job(candidate_id, job_id)
+            
+            if result.get('success'):
+                mark_seen(processed_key)
+                logger.info(f"Successfully processed candidate {candidate_id}")
+            else:
+                logger.error(f"Failed to process: {result.get('error')}")
+            
+    except Exception as e:
+        logger.error(f"Error processing candidate {candidate_id}: {e}")
 
-def check_for_questionnaire_tag(candidate_id):
-    """Check if candidate has questionnaire-related tag"""
+def process_pipeline_event(cats, processor, candidate_id):
+    """Background task: process a candidate whose pipeline status hit a trigger"""
     try:
-        # Tags are in a separate endpoint
-        import requests
-        url = f"{cats_client.base_url}/candidates/{candidate_id}/tags"
-        response = requests.get(url, headers=cats_client.headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            tags = data.get('_embedded', {}).get('tags', [])
+        bundle = cats.get_candidate_bundle(candidate_id, ('attachments', 'pipelines'))
+        
+        # Check and process if has questionnaire
+        if not check_for_questionnaire(candidate_id, bundle['attachments']):
+            logger.info(f"No questionnaire found for candidate {candidate_id}")
+            mark_seen(('no_questionnaire', candidate_id), NO_QUESTIONNAIRE_TTL)
+            return
+        
+        logger.info(f"Questionnaire found for candidate {candidate_id}")
+        forget(('no_questionnaire', candidate_id))
+        job_id = get_candidate_job_id(candidate_id, bundle['pipelines'])
+        if not job_id:
+            logger.warning(f"No job ID found for candidate {candidate_id}")
+            return
+        
+        # Wait out any run already in flight, then skip if it covered this job
+        with candidate_lock(candidate_id):
+            # A different trigger may already have processed this candidate for this job
+            processed_key = ('processed', candidate_id, job_id)
+            if seen_recently(processed_key):
+                logger.info(f"Candidate {candidate_id} already processed for job {job_id}, skipping")
+                return
             
-            # Check for questionnaire-related tags
-            questionnaire_tags = [
-                'questionnaire ready', 
-                'has questionnaire', 
-                'questionnaire uploaded',
-                'application status: questionnaire completed',
-                'questionnaire completed'
-            ]
+            logger.info(f"Processing candidate {candidate_id} for job {job_id}")
+            result = processor.process_candidate_for_job(candidate_id, job_id)
             
-            for tag in tags:
-                tag_name = tag.get('title', '').lower()
-                # Check exact matches
-                if tag_name in questionnaire_tags:
-                    logger.info(f"Found questionnaire tag: {tag.get('title')}")
-                    return True
-                # Check partial matches
-                if any(q_tag in tag_name for q_tag in questionnaire_tags):
-                    logger.info(f"Found questionnaire tag: {tag.get('title')}")
-                    return True
+            if result.get('success'):
+                mark_seen(processed_key)
+                logger.info(f"✅ Successfully processed candidate {candidate_id}")
+            else:
+                logger.error(f"❌ Failed to process candidate {candidate_id}: {result.get('error')}")
+            
+    except Exception as e:
+        logger.error(f"Error processing candidate {candidate_id}: {e}")
+
+def check_for_questionnaire(candidate_id, attachments=None):
+    """Check if candidate has questionnaire attachment (fetched unless provided)"""
+    try:
+        if attachments is None:
+            attachments = app.state.cats.get_candidate_attachments(candidate_id)
+        
+        return any(_QUESTIONNAIRE_FILE_RE.search(a.get('filename', '')) for a in attachments)
+    except:
+        return False
+
+def check_for_questionnaire_tag(candidate_id, tags=None):
+    """Check if candidate has questionnaire-related tag (fetched unless provided)"""
+    try:
+        if tags is None:
+            # Tags are in a separate endpoint
+            tags = app.state.cats.get_candidate_bundle(candidate_id, ('tags',))['tags']
+        
+        for tag in tags:
+            if _QUESTIONNAIRE_TAG_RE.search(tag.get('title', '')):
+                logger.info(f"Found questionnaire tag: {tag.get('title')}")
+                return True
         return False
     except Exception as e:
         logger.error(f"Error checking tags: {e}")
         return False
 
-def get_candidate_job_id(candidate_id):
-    """Get job ID from candidate's applications"""
+def get_candidate_job_id(candidate_id, pipelines=None):
+    """Get job ID from candidate's applications (pipelines fetched unless provided)"""
     try:
-        # Check pipeline entries
-        import requests
-        url = f"{cats_client.base_url}/candidates/{candidate_id}/pipelines"
-        response = requests.get(url, headers=cats_client.headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            pipelines = data.get('_embedded', {}).get('pipelines', [])
-            if pipelines:
-                # Return the first job ID found
-                return pipelines[0].get('job_id')
+        if pipelines is None:
+            # Check pipeline entries
+            pipelines = app.state.cats.get_candidate_bundle(candidate_id, ('pipelines',))['pipelines']
+        
+        if pipelines:
+            # Return the first job ID found
+            return pipelines[0].get('job_id')
     except Exception as e:
         logger.error(f"Error getting job ID: {e}")
     return None
@@ -251,4 +440,10 @@ async def test_webhook():
 
 if __name__ == '__main__':
     port = int(os.getenv('WEBHOOK_PORT', 8080))
-    uvicorn.run(app, host='0.0.0.0', port=port, log_level='info')
\ No newline at end of file
+    workers = int(os.getenv('WEB_WORKERS', 1))
+    # Multiple workers need an import string so each process builds its own clients;
+    # dedupe keys and candidate locks are shared through WEBHOOK_STATE_DB
+    uvicorn.run(
+        'catsone.scripts.webhook_handler:app' if workers > 1 else app,
+        host='0.0.0.0', port=port, workers=workers, log_level='info'
+    )
\ No newline at end of file
@@ -4,8 +4,13 @@ Maps project-specific channels and settings
 """
 
 import os
+import re
+import functools
 from typing import Dict, Optional
 
+# Job type keywords by routing priority: equipment, then management, then trades
+_JOB_ROUTE_RE = re.compile(r'(equipment|operator)|(manager|supervisor)|(mechanic|technician|electrician)')
+
 class SlackConfig:
     """Project-specific Slack configuration"""
     
@@ -35,23 +40,29 @@ class SlackConfig:
             "urgent": self.channels["recruitment"]["urgent"]
         }
         
+        # Channel per _JOB_ROUTE_RE group; job titles repeat heavily, so cache the routing
+        self._route_channels = (
+            self.channels["skilled_trades"]["equipment"],
+            self.channels["recruitment"]["managers"],
+            self.channels["skilled_trades"]["notifications"]
+        )
+        self._route_job_type = functools.lru_cache(maxsize=256)(self._match_job_type)
+        
     def get_channel_for_job(self, job_type: str, urgency: str = "normal") -> str:
         """Get appropriate channel based on job type and urgency"""
         
         if urgency == "urgent":
             return self.channels["recruitment"]["urgent"]
         
-        # Map job types to channels
-        job_type_lower = job_type.lower()
+        return self._route_job_type(job_type)
+    
+    def _match_job_type(self, job_type: str) -> str:
+        """Map a job type to its channel in one regex pass, honouring keyword priority"""
         
-        if "equipment" in job_type_lower or "operator" in job_type_lower:
-            return self.channels["skilled_trades"]["equipment"]
-        elif "manager" in job_type_lower or "supervisor" in job_type_lower:
-            return self.channels["recruitment"]["managers"]
-        elif any(trade in job_type_lower for trade in ["mechanic", "technician", "electrician"]):
-            return self.channels["skilled_trades"]["notifications"]
-        else:
-            return self.channels["recruitment"]["notifications"]
+        groups = [m.lastindex for m in _JOB_ROUTE_RE.finditer(job_type.lower())]
+        if groups:
+            return self._route_channels[min(groups) - 1]
+        return self.channels["recruitment"]["notifications"]
     
     def get_channel_by_match_score(self, match_score: int, job_type: str) -> str:
         """Route to different channels based on match quality"""
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Candidate Name Index - Local SQLite FTS5 copy of CATS candidate names
+Lets the matcher find candidates without paging through the whole CATS list
+"""
+
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List
+
+sys.path.append('/home/gotime2022/recruitment_ops')
+from catsone.config import CANDIDATE_INDEX_DB, CANDIDATE_INDEX_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+class CandidateNameIndex:
+    """Accent-folded full-text index of CATS candidate first/last names"""
+    
+    def __init__(self, db_path: str = CANDIDATE_INDEX_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            # remove_diacritics folds é -> e, so accented and plain spellings hit the same tokens
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS cand_fts USING fts5("
+                "id UNINDEXED, first, last, tokenize='unicode61 remove_diacritics 2')"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cand_meta (key TEXT PRIMARY KEY, value REAL)")
+    
+    def rebuild(self, candidates: Iterable[Dict]) -> int:
+        """Replace the index contents with the given CATS candidate records"""
+        
+        rows = [
+            (candidate.get('id'), candidate.get('first_name') or '', candidate.get('last_name') or '')
+            for candidate in candidates
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cand_fts")
+            self._conn.executemany("INSERT INTO cand_fts (id, first, last) VALUES (?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cand_meta (key, value) VALUES ('refreshed_at', ?)", (time.time(),)
+            )
+        logger.info(f"Indexed {len(rows)} candidate names in {self.db_path}")
+        return len(rows)
+    
+    def is_fresh(self, max_age: float = CANDIDATE_INDEX_MAX_AGE) -> bool:
+        """True if the index was rebuilt within max_age seconds"""
+        
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cand_meta WHERE key = 'refreshed_at'").fetchone()
+        return bool(row) and time.time() - row[0] < max_age
+    
+    def lookup(self, first_name: str, last_name: str, limit: int = 25) -> List[int]:
+        """Candidate IDs whose first and last names start with the given names"""
+        
+        query = f"first : {self._phrase(first_name)}* AND last : {self._phrase(last_name)}*"
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id FROM cand_fts WHERE cand_fts MATCH ? LIMIT ?", (query, limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Candidate index lookup failed for {first_name} {last_name}: {e}")
+            return []
+        return [row[0] for row in rows]
+    
+    @staticmethod
+    def _phrase(text: str) -> str:
+        """Quote text as an FTS5 phrase so names can't inject query syntax"""
+        return '"' + text.replace('"', '""') + '"'
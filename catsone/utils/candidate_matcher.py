@@ -6,21 +6,70 @@ Handles the critical ID matching problem
 
 import logging
 import os
+import sqlite3
+import functools
+import unicodedata
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
 import re
+import threading
 
 import sys
 sys.path.append('/home/gotime2022/recruitment_ops')
 from catsone.integration.cats_integration import CATSClient
+from catsone.utils.candidate_index import CandidateNameIndex
 
 logger = logging.getLogger(__name__)
 
+PAGE_SIZE = 50  # candidates per CATS list page
+PAGE_WINDOW = 10  # list pages fetched in parallel
+NAME_SIMILARITY_CUTOFF = 0.7  # fuzzy name ratio below this earns no name credit
+
+@functools.lru_cache(maxsize=8192)
+def normalize_name(name):
+    """Normalize accents for better matching"""
+    # Convert accented chars to base chars: é -> e, á -> a, etc.
+    normalized = unicodedata.normalize('NFD', name)
+    ascii_name = normalized.encode('ascii', 'ignore').decode('ascii')
+    return ascii_name.lower()
+
+def name_similarity(a, b):
+    """0-1 similarity of two names, ignoring accents, case and word order"""
+    a = ' '.join(sorted(normalize_name(a).split()))
+    b = ' '.join(sorted(normalize_name(b).split()))
+    if not a or not b:
+        return 0.0
+    matcher = SequenceMatcher(None, a, b)
+    # quick_ratio is a cheap upper bound; skip the full comparison when it can't reach the cutoff
+    if matcher.quick_ratio() < NAME_SIMILARITY_CUTOFF:
+        return 0.0
+    return matcher.ratio()
+
+# One name index per process, shared by every matcher; rebuilt in the background when stale
+_shared_index = None
+_shared_index_lock = threading.Lock()
+_refresh_thread = None
+
+def shared_name_index() -> Optional[CandidateNameIndex]:
+    """The process-wide candidate name index, opened on first use (None if the DB can't be opened)"""
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            try:
+                _shared_index = CandidateNameIndex()
+            except sqlite3.Error as e:
+                logger.error(f"Could not open candidate name index: {e}")
+                return None
+        return _shared_index
+
 class CandidateMatcher:
     """Match questionnaire data to correct CATS candidate record"""
     
-    def __init__(self, cats_client: CATSClient):
+    def __init__(self, cats_client: CATSClient, name_index: Optional[CandidateNameIndex] = None):
         self.cats = cats_client
+        self.name_index = name_index if name_index is not None else shared_name_index()
     
     def find_candidate_by_questionnaire(self, questionnaire_analysis: Dict) -> Optional[Dict]:
         """Find the correct CATS candidate record for a questionnaire"""
@@ -87,16 +136,6 @@ class CandidateMatcher:
     def _search_cats_candidates(self, name_parts: Dict[str, str]) -> List[Dict]:
         """Search CATS for candidates matching name with accent handling"""
         
-        import unicodedata
-        import requests
-        
-        def normalize_name(name):
-            """Normalize accents for better matching"""
-            # Convert accented chars to base chars: é -> e, á -> a, etc.
-            normalized = unicodedata.normalize('NFD', name)
-            ascii_name = normalized.encode('ascii', 'ignore').decode('ascii')
-            return ascii_name.lower()
-        
         # Get search variations with and without accents
         first_variations = [
             name_parts['first_name'].lower(),
@@ -108,71 +147,168 @@ class CandidateMatcher:
         ]
         
         # Remove duplicates
-        first_variations = list(set(first_variations))
-        last_variations = list(set(last_variations))
+        first_variations = frozenset(first_variations)
+        last_variations = frozenset(last_variations)
         
         logger.info(f"Searching for first name variations: {first_variations}")
         logger.info(f"Searching for last name variations: {last_variations}")
         
-        # Search through all candidates since CATS search doesn't work well
+        def name_matches(name, variations):
+            """Exact hit on a variation first, then substring match"""
+            name_lower = name.lower()
+            # Normalize candidate name too
+            name_norm = normalize_name(name)
+            if name_lower in variations or name_norm in variations:
+                return True
+            return any(var in name_lower or var in name_norm for var in variations)
+        
+        def is_match(candidate):
+            """Check a CATS record against every name variation, accent-insensitively"""
+            return (name_matches(candidate.get('first_name', ''), first_variations)
+                    and name_matches(candidate.get('last_name', ''), last_variations))
+        
+        # Let CATS filter by name first: raw and accent-stripped spellings, usually one query
+        queries = dict.fromkeys([
+            f"{name_parts['first_name']} {name_parts['last_name']}",
+            f"{normalize_name(name_parts['first_name'])} {normalize_name(name_parts['last_name'])}",
+        ])
+        candidates = self._query_cats_candidates(queries, is_match)
+        
+        # Then the local name index, if it has been refreshed recently
+        if not candidates and self.name_index:
+            if self.name_index.is_fresh():
+                candidates = self._lookup_indexed_candidates(first_variations, last_variations, is_match)
+            else:
+                # This lookup falls through to the scan; later ones get the rebuilt index
+                self.schedule_index_refresh()
+        
+        # Search through all candidates only if the faster lookups missed
+        if not candidates:
+            logger.info("CATS search returned no match, scanning candidate list")
+            candidates = self._scan_cats_candidates(is_match)
+        
+        logger.info(f"Found {len(candidates)} matching candidates")
+        return candidates
+    
+    def _query_cats_candidates(self, queries, is_match) -> List[Dict]:
+        """Run CATS name searches and keep the results that pass local verification"""
+        
+        candidates = {}
+        for query in queries:
+            data = self.cats.search_candidates(query)
+            if not data:
+                continue
+            
+            for candidate in data.get('_embedded', {}).get('candidates', []):
+                if candidate.get('id') not in candidates and is_match(candidate):
+                    logger.debug("Found candidate match: %s %s (ID: %s)", candidate.get('first_name'), candidate.get('last_name'), candidate.get('id'))
+                    candidates[candidate.get('id')] = candidate
+        
+        return list(candidates.values())
+    
+    def _lookup_indexed_candidates(self, first_variations, last_variations, is_match) -> List[Dict]:
+        """Find candidate IDs in the local name index, then fetch and verify each record"""
+        
+        candidate_ids = dict.fromkeys(
+            candidate_id
+            for first in first_variations
+            for last in last_variations
+            for candidate_id in self.name_index.lookup(first, last)
+        )
+        
         candidates = []
-        page = 1
-        max_pages = 50  # Search through more candidates
+        for candidate_id in candidate_ids:
+            candidate = self.cats.get_candidate_details(candidate_id)
+            if candidate and is_match(candidate):
+                logger.debug("Found indexed candidate match: %s %s (ID: %s)", candidate.get('first_name'), candidate.get('last_name'), candidate_id)
+                candidates.append(candidate)
+        return candidates
+    
+    def _scan_cats_candidates(self, is_match) -> List[Dict]:
+        """Page through the candidate list until a page yields matches"""
         
-        while page <= max_pages:
-            try:
-                url = f"{self.cats.base_url}/candidates"
-                params = {"per_page": 50, "page": page}
-                response = requests.get(url, headers=self.cats.headers, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if '_embedded' in data:
-                        page_candidates = data['_embedded'].get('candidates', [])
-                        
-                        if not page_candidates:
-                            break  # No more candidates
-                        
-                        # Check each candidate for name matches
-                        for candidate in page_candidates:
-                            first_name = candidate.get('first_name', '').lower()
-                            last_name = candidate.get('last_name', '').lower()
-                            
-                            # Normalize candidate name too
-                            first_norm = normalize_name(candidate.get('first_name', ''))
-                            last_norm = normalize_name(candidate.get('last_name', ''))
-                            
-                            # Check if any variation matches
-                            first_match = any(var in first_name or var in first_norm for var in first_variations)
-                            last_match = any(var in last_name or var in last_norm for var in last_variations)
-                            
-                            if first_match and last_match:
-                                logger.info(f"Found candidate match: {candidate.get('first_name')} {candidate.get('last_name')} (ID: {candidate.get('id')})")
-                                candidates.append(candidate)
-                        
-                        # If we found matches, we can stop searching
-                        if candidates:
-                            break
-                            
-                        # Check if this was the last page
-                        if len(page_candidates) < 50:
-                            break
-                    else:
-                        break
-                else:
-                    logger.error(f"API error on page {page}: {response.status_code}")
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Error searching page {page}: {e}")
+        candidates = []
+        for page_candidates in self._iter_candidate_pages(max_pages=50):  # Search through more candidates
+            # Check each candidate for name matches
+            for candidate in page_candidates:
+                if is_match(candidate):
+                    logger.debug("Found candidate match: %s %s (ID: %s)", candidate.get('first_name'), candidate.get('last_name'), candidate.get('id'))
+                    candidates.append(candidate)
+            
+            # If we found matches, we can stop searching
+            if candidates:
                 break
-                
-            page += 1
         
-        logger.info(f"Found {len(candidates)} matching candidates")
         return candidates
     
+    def _iter_candidate_pages(self, max_pages: int, window: int = PAGE_WINDOW):
+        """Yield pages of CATS candidate records until the list runs out or max_pages is hit
+        
+        Pages are requested `window` at a time in parallel but yielded in order, so a
+        caller that stops early wastes at most one window of requests.
+        """
+        
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            for first in range(1, max_pages + 1, window):
+                pages = range(first, min(first + window, max_pages + 1))
+                for page_candidates in executor.map(self._fetch_candidate_page, pages):
+                    if not page_candidates:
+                        return  # API error or no more candidates
+                    
+                    yield page_candidates
+                    
+                    # Check if this was the last page
+                    if len(page_candidates) < PAGE_SIZE:
+                        return
+    
+    def _fetch_candidate_page(self, page: int) -> Optional[List[Dict]]:
+        """One page of the CATS candidate list, or None on error"""
+        
+        try:
+            url = f"{self.cats.base_url}/candidates"
+            params = {"per_page": PAGE_SIZE, "page": page}
+            response = self.cats.session.get(url, params=params)
+            
+            if response.status_code != 200:
+                logger.error(f"API error on page {page}: {response.status_code}")
+                return None
+            
+            data = response.json()
+            return data.get('_embedded', {}).get('candidates', [])
+            
+        except Exception as e:
+            logger.error(f"Error searching page {page}: {e}")
+            return None
+    
+    def schedule_index_refresh(self) -> bool:
+        """Rebuild the name index on a background thread unless a rebuild is already running"""
+        global _refresh_thread
+        
+        with _shared_index_lock:
+            if _refresh_thread is not None and _refresh_thread.is_alive():
+                return False
+            _refresh_thread = threading.Thread(target=self.refresh_name_index, name="candidate-index-refresh", daemon=True)
+            _refresh_thread.start()
+        logger.info("Candidate name index is stale, rebuilding in the background")
+        return True
+    
+    def refresh_name_index(self, max_pages: int = 1000) -> int:
+        """Rebuild the local name index from the full CATS candidate list
+        
+        Matchers call this in the background when the index is stale; it can also run from
+        cron with --refresh-index so the first lookup of the hour never hits a stale index.
+        """
+        
+        if not self.name_index:
+            self.name_index = CandidateNameIndex()
+        
+        candidates = [c for page in self._iter_candidate_pages(max_pages) for c in page]
+        if not candidates:
+            # Keep the previous index rather than wiping it on a failed fetch
+            logger.error("No candidates fetched from CATS, leaving name index unchanged")
+            return 0
+        return self.name_index.rebuild(candidates)
+    
     def _find_best_match(self, candidates: List[Dict], questionnaire_analysis: Dict) -> Optional[Dict]:
         """Find the best matching candidate using multiple criteria"""
         
@@ -187,8 +323,10 @@ class CandidateMatcher:
         
         scored_candidates = []
         
+        # One reference time for the whole scoring pass
+        now = datetime.now(timezone.utc)
         for candidate in candidates:
-            score = self._calculate_match_score(candidate, questionnaire_analysis)
+            score = self._calculate_match_score(candidate, questionnaire_analysis, now)
             scored_candidates.append((candidate, score))
         
         # Sort by score (highest first)
@@ -205,10 +343,13 @@ class CandidateMatcher:
         
         return None
     
-    def _calculate_match_score(self, candidate: Dict, questionnaire_analysis: Dict) -> float:
+    def _calculate_match_score(self, candidate: Dict, questionnaire_analysis: Dict,
+                               now: Optional[datetime] = None) -> float:
         """Calculate match confidence score between candidate and questionnaire"""
         
         score = 0.0
+        if now is None:
+            now = datetime.now(timezone.utc)
         
         # Get questionnaire data
         candidate_profile = questionnaire_analysis.get('candidate_profile', {})
@@ -221,6 +362,11 @@ class CandidateMatcher:
         
         if questionnaire_name in cats_name or cats_name in questionnaire_name:
             score += 0.6  # High weight for name match
+        else:
+            # Typos, accents and swapped first/last names earn proportional credit
+            similarity = name_similarity(questionnaire_name, cats_name)
+            if similarity >= NAME_SIMILARITY_CUTOFF:
+                score += 0.6 * similarity
         
         # Check for additional matching criteria
         # Employment status
@@ -236,8 +382,10 @@ class CandidateMatcher:
         if candidate.get('last_modified'):
             try:
                 last_modified = datetime.fromisoformat(candidate['last_modified'].replace('Z', '+00:00'))
-                days_ago = (datetime.now() - last_modified).days
-                if days_ago <= 30:  # Active within last 30 days
+                if last_modified.tzinfo is None:
+                    # CATS timestamps are UTC even when the offset is omitted
+                    last_modified = last_modified.replace(tzinfo=timezone.utc)
+                if (now - last_modified).days <= 30:  # Active within last 30 days
                     score += 0.1
             except:
                 pass
@@ -288,6 +436,12 @@ if __name__ == "__main__":
     cats_client = CATSClient()
     matcher = CandidateMatcher(cats_client)
     
+    # Cron entry point: rebuild the local name index and exit
+    if '--refresh-index' in sys.argv:
+        count = matcher.refresh_name_index()
+        print(f"Indexed {count} candidates")
+        sys.exit(0)
+    
     # Sample questionnaire analysis (from our vision processing)
     sample_analysis = {
         'candidate_profile': {
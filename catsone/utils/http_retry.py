@@ -0,0 +1,111 @@
+"""
+HTTP Retry Helpers
+Exponential backoff with full jitter and a shared rate limit for outbound Slack/MCP posts
+
+Only transient failures (timeouts, connection errors, 429/5xx) are retried,
+and a shared budget caps how many retries can go out per minute so a burst
+of failing notifications can't turn into a retry storm. slack_rate_limit is a
+token bucket sized to Slack's ~1 message/second tolerance; callers charge it
+once per user-visible post, never for retries.
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+import httpx
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_BUDGET_PER_MINUTE = 30
+SLACK_RATE = 1.0  # sustained Slack posts per second
+SLACK_BURST = 5  # posts allowed back to back before the rate applies
+
+
+class RetryBudget:
+    """Token bucket limiting retries across all callers"""
+    
+    def __init__(self, per_minute: int = RETRY_BUDGET_PER_MINUTE):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def take(self) -> bool:
+        """Spend one retry if any are left"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+retry_budget = RetryBudget()
+
+
+class AsyncTokenBucket:
+    """Token bucket that awaits until a token is free"""
+    
+    def __init__(self, rate: float = SLACK_RATE, capacity: int = SLACK_BURST):
+        self.rate = rate
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+    
+    async def acquire(self):
+        while True:
+            # No await between refill and spend, so this is atomic within the event loop
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+slack_rate_limit = AsyncTokenBucket()
+
+
+def backoff_delay(attempt: int, base: float = 1.0, max_delay: float = 8.0) -> float:
+    """Full-jitter delay before retry number attempt (0-based)"""
+    return random.uniform(0, min(base * 2 ** attempt, max_delay))
+
+
+async def post_with_retry(client: httpx.AsyncClient, url: str, max_attempts: int = 3,
+                          on_failure: Optional[Callable[[], bool]] = None,
+                          rate_limit: Optional[AsyncTokenBucket] = None, **kwargs) -> httpx.Response:
+    """POST with retries on transient failures; 4xx and other permanent errors return at once
+    
+    on_failure is called after every transient failure; returning False stops retrying
+    (e.g. when a circuit breaker has just opened). The last response is returned, or the
+    last transport error raised, once attempts or the retry budget run out. If rate_limit
+    is given, one token is taken before the first attempt; retries are not charged.
+    """
+    
+    if rate_limit:
+        await rate_limit.acquire()
+    for attempt in range(max_attempts):
+        try:
+            response = await client.post(url, **kwargs)
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            keep_going = on_failure() if on_failure else True
+            if attempt == max_attempts - 1 or keep_going is False or not retry_budget.take():
+                raise
+            logger.warning(f"POST {url} failed ({e!r}), retrying")
+        else:
+            if response.status_code not in TRANSIENT_STATUSES:
+                return response
+            keep_going = on_failure() if on_failure else True
+            if attempt == max_attempts - 1 or keep_going is False or not retry_budget.take():
+                return response
+            logger.warning(f"POST {url} returned {response.status_code}, retrying")
+        
+        await asyncio.sleep(backoff_delay(attempt))
@@ -5,39 +5,221 @@ Wraps MCP Slack server calls for project-specific use
 
 import os
 import json
+import atexit
+import asyncio
+import hashlib
 import httpx
 import logging
-from typing import Dict, Optional, Any
+import time
+from typing import Dict, List, Optional, Any
 from ..slack_config import slack_config
+from .http_retry import post_with_retry, slack_rate_limit, AsyncTokenBucket, TRANSIENT_STATUSES
+from .slack_notifier import score_tier
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATION_DEDUPE_TTL = 3600  # seconds a posted candidate notification suppresses repeats
+MCP_FAILURE_THRESHOLD = 5  # consecutive failures before MCP calls short-circuit
+MCP_RESET_TIMEOUT = 30.0  # seconds before a trial call is let through
+MCP_MAX_CONCURRENCY = 16  # MCP calls in flight at once
+MCP_SLOT_TIMEOUT = 5.0  # seconds to wait for a free slot before falling back
+
+
+class MCPCircuitOpen(Exception):
+    """Raised instead of calling MCP while the circuit breaker is open"""
+
+
+class MCPBusy(Exception):
+    """Raised when every MCP slot stayed taken for MCP_SLOT_TIMEOUT seconds"""
+
+
+class _CircuitBreaker:
+    """CLOSED -> OPEN after repeated failures -> HALF_OPEN trial after a cooldown"""
+    
+    def __init__(self, failure_threshold: int = MCP_FAILURE_THRESHOLD, reset_timeout: float = MCP_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.fail_count = 0
+        self.opened_at = 0.0
+    
+    def allow(self) -> bool:
+        """True if a call may go out now"""
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            return True
+        # Only the single trial call goes out while half-open
+        return self.state == "closed"
+    
+    def record_success(self):
+        self.state = "closed"
+        self.fail_count = 0
+    
+    def record_failure(self) -> bool:
+        """Count a failed call; returns False once the circuit is open"""
+        self.fail_count += 1
+        if self.state == "half_open" or self.fail_count >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"MCP circuit opened after {self.fail_count} consecutive failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        return self.state != "open"
+
+
 class MCPSlackClient:
     """Client for interacting with Slack via MCP server"""
     
     def __init__(self):
         self.mcp_url = "http://localhost:8017"
         self.headers = {"Content-Type": "application/json"}
+        # Fail fast to the webhook fallback while the MCP server is down
+        self.breaker = _CircuitBreaker()
+        # Bulkhead: caps concurrent MCP calls so a burst queues here instead of swamping the server
+        self._slots = None
+        self._slots_loop = None
+        self.in_flight = 0
+        # Keep-alive client shared by MCP and webhook calls; built on first use per event loop
+        self._client = None
+        self._client_loop = None
+        # notification key -> (expires_at, thread_ts) for candidates already posted
+        self._posted = {}
+        # notification key -> future resolved with thread_ts once the in-flight post finishes
+        self._sending = {}
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for the running event loop; the previous loop's client is closed"""
+        
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            stale, stale_loop = self._client, self._client_loop
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+            self._client_loop = loop
+            if stale is not None:
+                await self._close_stale_client(stale, stale_loop)
+        return self._client
+    
+    @staticmethod
+    async def _close_stale_client(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        """Close a client built on another event loop, on that loop"""
+        try:
+            if loop.is_closed():
+                # Its transports went with the loop; aclose() can no longer run anywhere
+                logger.debug("Event loop of the previous HTTP pool is closed, dropping the pool")
+            elif loop.is_running():
+                # Running in another thread: hand it the close
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                # Idle loop: run the close on it from a worker thread so this loop isn't blocked
+                await asyncio.to_thread(loop.run_until_complete, client.aclose())
+        except Exception as e:
+            logger.debug(f"Closing the previous HTTP pool failed: {e}")
+    
+    def _get_slots(self) -> asyncio.Semaphore:
+        """MCP concurrency limit for the running event loop"""
+        
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(MCP_MAX_CONCURRENCY)
+            self._slots_loop = loop
+            self.in_flight = 0
+        return self._slots
+    
+    async def close(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+    
+    def _close_at_exit(self):
+        """Best-effort close at interpreter exit if the pool's event loop can still run it"""
+        loop = self._client_loop
+        if self._client is None or loop is None or loop.is_closed() or loop.is_running():
+            return
+        try:
+            loop.run_until_complete(self.close())
+        except Exception as e:
+            logger.debug(f"Closing HTTP pool at exit failed: {e}")
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+        
+    async def _call_mcp_tool(self, tool_name: str, params: Dict[str, Any],
+                             rate_limit: Optional[AsyncTokenBucket] = None) -> Dict[str, Any]:
+        """Call an MCP tool via HTTP, with at most MCP_MAX_CONCURRENCY calls in flight
         
-    async def _call_mcp_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Call an MCP tool via HTTP"""
+        rate_limit is charged once before a slot is taken, so calls waiting on it never hold a slot.
+        """
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
+        if rate_limit:
+            await rate_limit.acquire()
+        
+        # Take a slot before consulting the breaker so a half-open trial is never stranded
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), MCP_SLOT_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise MCPBusy(f"No free MCP slot for {tool_name} after {MCP_SLOT_TIMEOUT}s")
+        
+        self.in_flight += 1
+        try:
+            return await self._send_mcp_tool(tool_name, params)
+        finally:
+            self.in_flight -= 1
+            slots.release()
+    
+    async def _send_mcp_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """One guarded MCP tool call: circuit breaker, then POST with retries"""
+        
+        if not self.breaker.allow():
+            raise MCPCircuitOpen(f"MCP circuit open, skipping {tool_name}")
+        
+        # Every transient failure, retried or not, counts against the breaker
+        try:
+            response = await post_with_retry(
+                await self._get_client(),
                 f"{self.mcp_url}/tools/{tool_name}",
+                on_failure=self.breaker.record_failure,
                 headers=self.headers,
-                json=params,
-                timeout=30.0
+                json=params
             )
+        except (httpx.TimeoutException, httpx.NetworkError):
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled (timeout, shutdown): a half-open trial must still re-open the circuit,
+            # or the breaker would stay half-open and reject every later call
+            if self.breaker.state == "half_open":
+                self.breaker.record_failure()
+            raise
             
         if response.status_code != 200:
+            # Transient statuses were already counted; a rejected request doesn't mean MCP is down
+            if response.status_code < 500:
+                if response.status_code not in TRANSIENT_STATUSES:
+                    self.breaker.record_success()
+            elif response.status_code not in TRANSIENT_STATUSES:
+                self.breaker.record_failure()
             raise Exception(f"MCP call failed: {response.text}")
-            
+        
+        self.breaker.record_success()
         return response.json()
     
     async def post_message(self, text: str, channel: Optional[str] = None, 
-                          job_type: Optional[str] = None, urgency: str = "normal") -> Dict[str, Any]:
-        """Post a message, automatically routing to appropriate channel"""
+                          job_type: Optional[str] = None, urgency: str = "normal",
+                          blocks: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Post a message, automatically routing to appropriate channel
+        
+        With blocks, text is only the notification/preview fallback.
+        """
         
         # Determine channel if not specified
         if not channel:
@@ -49,59 +231,121 @@ class MCPSlackClient:
         # Format channel
         channel = slack_config.format_channel_id(channel)
         
+        params = {
+            "channel_id": channel,
+            "text": text
+        }
+        if blocks:
+            params["blocks"] = blocks
+        
         try:
-            result = await self._call_mcp_tool("slack_post_message", {
-                "channel_id": channel,
-                "text": text
-            })
+            # Only the visible post is charged against Slack's rate; replies and reactions are not
+            result = await self._call_mcp_tool("slack_post_message", params, rate_limit=slack_rate_limit)
             
             logger.info(f"Posted message to {channel}")
             return result
             
         except Exception as e:
             logger.error(f"Failed to post to Slack: {e}")
-            # Fallback to webhook if available
-            return await self._fallback_webhook(text, channel)
+            # Fallback to webhook if available; this post was already charged against the rate limit
+            return await self._fallback_webhook(text, channel, blocks)
     
     async def post_candidate_notification(self, candidate_info: Dict, 
                                         analysis_result: Dict, 
                                         job_info: Dict) -> Optional[str]:
         """Post candidate notification to appropriate channel based on score and job type"""
         
+        match_score = analysis_result.get('match_score', 0)
+        
+        # Retried triggers for the same candidate/job/score reuse the first post
+        key = self._notification_key(candidate_info, job_info, match_score)
+        now = time.monotonic()
+        posted = self._posted.get(key)
+        if posted and posted[0] > now:
+            logger.info(f"Candidate {candidate_info.get('id')} already notified for job {job_info.get('id')}, skipping")
+            return posted[1]
+        
+        # The key is reserved before the first await; a concurrent send waits for that post's outcome
+        loop = asyncio.get_running_loop()
+        sending = self._sending.get(key)
+        if sending is not None and sending.get_loop() is loop:
+            logger.info(f"Candidate {candidate_info.get('id')} notification already being posted, waiting for it")
+            return await asyncio.shield(sending)
+        
+        sending = self._sending[key] = loop.create_future()
+        thread_ts = None
+        try:
+            thread_ts = await self._send_candidate_notification(key, candidate_info, analysis_result, job_info)
+            return thread_ts
+        finally:
+            del self._sending[key]
+            sending.set_result(thread_ts)
+    
+    async def _send_candidate_notification(self, key: str, candidate_info: Dict,
+                                           analysis_result: Dict, job_info: Dict) -> Optional[str]:
+        """Post one candidate notification (MCP, else webhook fallback) and record it under key"""
+        
         match_score = analysis_result.get('match_score', 0)
         job_type = job_info.get('type', job_info.get('title', ''))
         
         # Route to appropriate channel
         channel = slack_config.get_channel_by_match_score(match_score, job_type)
         
-        # Format the message
-        from ..utils.slack_notifier import SlackNotifier
+        # Structured blocks carry the message; text is just the short preview for notifications
+        from ..utils.slack_notifier import SlackNotifier, create_slack_blocks
         notifier = SlackNotifier()
-        message = notifier.format_manager_notification(candidate_info, analysis_result, job_info)
+        blocks = create_slack_blocks(candidate_info, analysis_result)
+        candidate_name = f"{candidate_info.get('first_name', '')} {candidate_info.get('last_name', '')}".strip()
+        preview = f"🔔 New candidate for review: {candidate_name} - {job_info.get('title', 'Unknown Position')} ({match_score}%)"
         
         try:
             # Post main message
-            result = await self.post_message(message, channel=channel)
+            result = await self.post_message(preview, channel=channel, blocks=blocks)
+            if not result.get('success'):
+                return None
             
-            if result.get('success'):
-                thread_ts = result.get('timestamp')
-                
-                # Add reactions based on score
-                if match_score >= 90:
-                    await self.add_reaction(channel, thread_ts, "fire")
-                elif match_score >= 75:
-                    await self.add_reaction(channel, thread_ts, "thumbsup")
-                
+            # A webhook fallback post counts too, but has no timestamp to react to or thread under
+            thread_ts = result.get('timestamp')
+            self._remember_posted(key, thread_ts)
+            
+            if thread_ts:
                 # Add detailed analysis in thread
                 detailed = notifier.format_analysis_summary(analysis_result)
-                await self.reply_to_thread(channel, thread_ts, detailed)
-                
-                return thread_ts
+                await self._post_thread_followups(channel, thread_ts, match_score, detailed)
+            return thread_ts
                 
         except Exception as e:
             logger.error(f"Failed to post candidate notification: {e}")
             return None
     
+    @staticmethod
+    def _notification_key(candidate_info: Dict, job_info: Dict, match_score) -> str:
+        """Dedupe key for one candidate/job/score notification"""
+        score = round(match_score) if isinstance(match_score, (int, float)) else match_score
+        raw = f"{candidate_info.get('id')}|{job_info.get('id')}|{score}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    def _remember_posted(self, key: str, thread_ts: Optional[str]):
+        now = time.monotonic()
+        # Drop expired keys so the table stays bounded
+        if len(self._posted) > 10000:
+            self._posted = {k: v for k, v in self._posted.items() if v[0] > now}
+        self._posted[key] = (now + NOTIFICATION_DEDUPE_TTL, thread_ts)
+    
+    async def _post_thread_followups(self, channel: str, thread_ts: str, match_score: float, detailed: str):
+        """Post the score reaction and the thread reply concurrently; both only need thread_ts"""
+        
+        followups = [self.reply_to_thread(channel, thread_ts, detailed)]
+        
+        # Add reactions based on score; lower tiers get none
+        _, reaction = score_tier(match_score)
+        if reaction:
+            followups.append(self.add_reaction(channel, thread_ts, reaction))
+        
+        for outcome in await asyncio.gather(*followups, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.error(f"Slack thread follow-up failed: {outcome}")
+    
     async def reply_to_thread(self, channel: str, thread_ts: str, text: str) -> Dict[str, Any]:
         """Reply to a thread"""
         
@@ -124,23 +368,29 @@ class MCPSlackClient:
             "reaction": reaction
         })
     
-    async def _fallback_webhook(self, text: str, channel: str) -> Dict[str, Any]:
+    async def _fallback_webhook(self, text: str, channel: str,
+                                blocks: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """Fallback to webhook if MCP fails"""
         
         webhook_url = os.getenv("SLACK_WEBHOOK_URL")
         if not webhook_url or webhook_url == "your_slack_webhook_url_here":
             return {"success": False, "error": "No webhook URL configured"}
         
+        payload = {
+            "text": text,
+            "channel": channel
+        }
+        if blocks:
+            payload["blocks"] = blocks
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    webhook_url,
-                    json={
-                        "text": text,
-                        "channel": channel
-                    }
-                )
-                
+            response = await post_with_retry(
+                await self._get_client(),
+                webhook_url,
+                json=payload,
+                timeout=10.0
+            )
+            
             return {
                 "success": response.status_code == 200,
                 "fallback": True,
@@ -153,4 +403,5 @@ class MCPSlackClient:
 
 
 # Singleton instance
-mcp_slack_client = MCPSlackClient()
\ No newline at end of file
+mcp_slack_client = MCPSlackClient()
+atexit.register(mcp_slack_client._close_at_exit)
\ No newline at end of file
@@ -8,10 +8,14 @@ Works from localhost - no ngrok needed for sending notifications!
 
 import os
 import json
+import atexit
+import time
+import asyncio
 import httpx
 import logging
 from typing import Dict, Optional, List
-from datetime import datetime
+from .http_retry import post_with_retry, slack_rate_limit
+from .slack_notifier import score_tier
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,45 @@ class SimpleSlackWebhook:
         self.webhook_url = os.getenv("SLACK_WEBHOOK_URL")
         if not self.webhook_url or self.webhook_url == "your_slack_webhook_url_here":
             logger.warning("SLACK_WEBHOOK_URL not configured")
+        # Keep-alive client reused across posts; built on first use per event loop
+        self._client = None
+        self._client_loop = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for the running event loop"""
+        
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=10.0)
+            self._client_loop = loop
+        return self._client
+    
+    async def warm(self):
+        """Open the pooled connection (DNS + TLS) at startup so the first notification doesn't pay for it"""
+        if not self.webhook_url:
+            return
+        try:
+            # Any status will do; only the established keep-alive connection matters
+            await self._get_client().head(self.webhook_url, timeout=5.0)
+        except Exception as e:
+            logger.warning(f"Slack webhook warmup failed: {e}")
+    
+    async def close(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+    
+    def _close_at_exit(self):
+        """Best-effort close at interpreter exit if the pool's event loop can still run it"""
+        loop = self._client_loop
+        if self._client is None or loop is None or loop.is_closed() or loop.is_running():
+            return
+        try:
+            loop.run_until_complete(self.close())
+        except Exception as e:
+            logger.debug(f"Closing HTTP pool at exit failed: {e}")
     
     async def send_notification(self, 
                                candidate_info: Dict, 
@@ -38,12 +81,12 @@ class SimpleSlackWebhook:
             message = self._format_message(candidate_info, analysis_result, job_info)
             
             # Send to Slack
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json={"text": message},
-                    timeout=10.0
-                )
+            response = await post_with_retry(
+                self._get_client(),
+                self.webhook_url,
+                rate_limit=slack_rate_limit,
+                json={"text": message}
+            )
             
             if response.status_code == 200:
                 logger.info("Successfully sent Slack notification")
@@ -64,40 +107,38 @@ class SimpleSlackWebhook:
         match_score = analysis_result.get('match_score', 'N/A')
         
         # Score indicator
-        if isinstance(match_score, (int, float)):
-            if match_score >= 90:
-                score_indicator = "🔥"
-            elif match_score >= 75:
-                score_indicator = "✅"
-            else:
-                score_indicator = "📊"
-        else:
-            score_indicator = "📊"
+        score_indicator, _ = score_tier(match_score)
         
-        message = f"""
+        parts = [f"""
 {score_indicator} *New Candidate Alert*
 
 *Candidate:* {candidate_name}
 *Position:* {job_title}
 *Match Score:* {match_score}%
 
-*Key Qualifications:*"""
+*Key Qualifications:*"""]
         
         # Add top qualifications
         if 'key_qualifications' in analysis_result:
-            for qual in analysis_result['key_qualifications'][:3]:
-                message += f"\n• {qual}"
+            parts.extend(f"\n• {qual}" for qual in analysis_result['key_qualifications'][:3])
         
         # Add equipment if relevant
         if 'equipment_brands' in analysis_result and analysis_result['equipment_brands']:
-            brands = ", ".join(analysis_result['equipment_brands'][:5])
-            message += f"\n\n*Equipment:* {brands}"
+            parts.append(f"\n\n*Equipment:* {', '.join(analysis_result['equipment_brands'][:5])}")
         
         # Add CATS link
         if candidate_info.get('id'):
-            message += f"\n\n<https://app.catsone.com/candidates/{candidate_info['id']}|View in CATS →>"
+            parts.append(f"\n\n<https://app.catsone.com/candidates/{candidate_info['id']}|View in CATS →>")
         
-        return message
+        return "".join(parts)
+    
+    @staticmethod
+    def _format_candidate_line(candidate: Dict) -> str:
+        """One bullet row of the batch summary"""
+        name = f"{candidate.get('first_name', '')} {candidate.get('last_name', '')}".strip()
+        score = candidate.get('match_score', 'N/A')
+        position = candidate.get('position', 'Unknown')
+        return f"• {name} - {position} ({score}%)"
     
     async def send_batch_summary(self, processed_count: int, high_match_candidates: List[Dict]) -> bool:
         """Send daily/batch processing summary"""
@@ -114,20 +155,17 @@ class SimpleSlackWebhook:
 """
             
             if high_match_candidates:
-                message += "\n*Top Candidates:*"
-                for candidate in high_match_candidates[:5]:
-                    name = f"{candidate.get('first_name', '')} {candidate.get('last_name', '')}".strip()
-                    score = candidate.get('match_score', 'N/A')
-                    position = candidate.get('position', 'Unknown')
-                    message += f"\n• {name} - {position} ({score}%)"
+                top = "\n".join(map(self._format_candidate_line, high_match_candidates[:5]))
+                message = f"{message}\n*Top Candidates:*\n{top}"
             
-            message += f"\n\n_Processed at {datetime.now().strftime('%Y-%m-%d %H:%M')}_"
+            message = f"{message}\n\n_Processed at {time.strftime('%Y-%m-%d %H:%M')}_"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.webhook_url,
-                    json={"text": message}
-                )
+            response = await post_with_retry(
+                self._get_client(),
+                self.webhook_url,
+                rate_limit=slack_rate_limit,
+                json={"text": message}
+            )
             
             return response.status_code == 200
             
@@ -137,4 +175,5 @@ class SimpleSlackWebhook:
 
 
 # Singleton instance
-slack_webhook = SimpleSlackWebhook()
\ No newline at end of file
+slack_webhook = SimpleSlackWebhook()
+atexit.register(slack_webhook._close_at_exit)
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Slack Webhook Batcher
+Coalesces notifications posted within a short window into one webhook call per channel
+
+There is one batcher per webhook URL for the whole process (see get_batcher),
+so every processor feeds the same queue. Messages are queued from any thread
+and flushed by a single daemon worker, so callers never wait on Slack.
+"""
+
+import os
+import queue
+import atexit
+import logging
+import threading
+import requests
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SLACK_BATCH_WINDOW = float(os.getenv("SLACK_BATCH_WINDOW", 2.0))  # seconds to gather messages before posting
+MAX_BLOCKS = 50  # Slack's per-message block limit
+
+
+class SlackBatcher:
+    """Queue Slack webhook messages and post each burst as one digest per channel"""
+    
+    def __init__(self, webhook_url: str, flush_interval: float = SLACK_BATCH_WINDOW, max_batch: int = 20):
+        self.webhook_url = webhook_url
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.session = requests.Session()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+    
+    def enqueue(self, message: Dict, channel: Optional[str] = None):
+        """Queue a webhook message ({'text': ..., 'blocks': [...]}) for the next flush to channel"""
+        self._ensure_worker()
+        self._queue.put((channel, message))
+    
+    def close(self, timeout: float = 10.0):
+        """Flush queued messages and stop the worker"""
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker and worker.is_alive():
+            self._queue.put(None)
+            worker.join(timeout)
+    
+    def _ensure_worker(self):
+        # Started on first use so importing or building a processor costs nothing
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="slack-batcher", daemon=True)
+                self._worker.start()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            stop = False
+            # Keep collecting until the window closes or the batch is full
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            for channel, messages in self._group_by_channel(batch).items():
+                for digest in self._combine(messages):
+                    if channel:
+                        digest = {**digest, 'channel': channel}
+                    self._post(digest)
+            if stop:
+                return
+    
+    @staticmethod
+    def _group_by_channel(batch: List[tuple]) -> Dict[Optional[str], List[Dict]]:
+        """Split (channel, message) pairs into per-channel lists, keeping arrival order"""
+        groups = {}
+        for channel, message in batch:
+            groups.setdefault(channel, []).append(message)
+        return groups
+    
+    @staticmethod
+    def _combine(batch: List[Dict]) -> List[Dict]:
+        """Merge messages into as few posts as Slack's block limit allows"""
+        
+        if len(batch) == 1:
+            return batch
+        
+        digests = []
+        texts, blocks = [], []
+        for message in batch:
+            message_blocks = message.get('blocks', [])
+            # One divider between messages; start a new post rather than exceed the block limit
+            if blocks and len(blocks) + 1 + len(message_blocks) > MAX_BLOCKS:
+                digests.append({'text': "\n".join(texts), 'blocks': blocks})
+                texts, blocks = [], []
+            if blocks:
+                blocks.append({'type': 'divider'})
+            texts.append(message.get('text', ''))
+            blocks.extend(message_blocks)
+        digests.append({'text': "\n".join(texts), 'blocks': blocks})
+        return digests
+    
+    def _post(self, message: Dict):
+        try:
+            response = self.session.post(self.webhook_url, json=message, timeout=10)
+            if response.status_code == 200:
+                logger.info(f"Slack digest sent ({len(message.get('blocks', []))} blocks)")
+            else:
+                logger.error(f"Failed to send Slack digest: {response.status_code}")
+        except Exception as e:
+            logger.error(f"Error sending Slack digest: {e}")
+
+
+# One batcher per webhook URL, shared by every processor in the process
+_batchers: Dict[str, SlackBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(webhook_url: str) -> SlackBatcher:
+    """Return the process-wide batcher for webhook_url, creating it on first use"""
+    with _batchers_lock:
+        batcher = _batchers.get(webhook_url)
+        if batcher is None:
+            batcher = _batchers[webhook_url] = SlackBatcher(webhook_url)
+        return batcher
+
+
+@atexit.register
+def _close_batchers():
+    # Post whatever is still queued when a short-lived script exits
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    for batcher in batchers:
+        batcher.close()
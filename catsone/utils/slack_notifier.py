@@ -5,9 +5,11 @@ Sends formatted notifications to hiring managers via Slack
 """
 
 import json
+import time
+import bisect
 import logging
-from typing import Dict, Optional, List
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
 
 # Import Slack MCP tools
 # These are available in your environment as shown in the MCP tools list
@@ -15,6 +17,48 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Shared across notifier instances; threads are only started once work is submitted.
+# Whole threads and their individual Slack calls use separate pools so a full
+# thread pool can never wait on its own follow-up calls.
+_thread_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="slack-notifier")
+_call_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="slack-call")
+
+# (threshold, emoji, reaction) ascending; a score gets the highest tier it reaches
+_SCORE_TIERS = ((0, "📊", None), (75, "✅", "thumbsup"), (90, "🔥", "fire"))
+_SCORE_THRESHOLDS = [tier[0] for tier in _SCORE_TIERS]
+
+
+# Static parts of the manager notification, built once; only the {fields} vary per candidate
+_MANAGER_HEADER = """
+🔔 *New Candidate Ready for Manager Review*
+
+*Candidate:* {candidate_name}
+*Position:* {job_title} at {company}
+*Match Score:* {match_score}% 
+*Status:* Manager Review Needed
+
+📊 *Key Highlights:*
+"""
+_MANAGER_FOOTER = """
+
+📋 *Next Steps:*
+1. Review full analysis in CATS
+2. Schedule screening call if interested
+3. Provide feedback in thread below
+
+🔗 *Links:*
+• <https://cats.example.com/candidates/{candidate_id}|View in CATS>
+• <https://cats.example.com/jobs/{job_id}|View Job Posting>
+"""
+
+
+def score_tier(match_score) -> Tuple[str, Optional[str]]:
+    """(emoji, reaction) for a match score; missing or non-numeric scores get the base tier"""
+    if not isinstance(match_score, (int, float)):
+        return _SCORE_TIERS[0][1:]
+    index = bisect.bisect_right(_SCORE_THRESHOLDS, match_score) - 1
+    return _SCORE_TIERS[max(index, 0)][1:]
+
 
 class SlackNotifier:
     """Handle Slack notifications for recruitment workflow"""
@@ -25,114 +69,105 @@ class SlackNotifier:
     def format_manager_notification(self, 
                                   candidate_info: Dict, 
                                   analysis_result: Dict,
-                                  job_info: Dict) -> str:
-        """Format a notification message for managers"""
+                                  job_info: Dict,
+                                  _now: Optional[str] = None) -> str:
+        """Format a notification message for managers
+        
+        _now is a preformatted timestamp, letting batch_render stamp a whole batch at once.
+        """
         
         candidate_name = f"{candidate_info.get('first_name', '')} {candidate_info.get('last_name', '')}".strip()
         job_title = job_info.get('title', 'Unknown Position')
         company = job_info.get('company', 'Unknown Company')
         match_score = analysis_result.get('match_score', 'N/A')
         
-        # Build message blocks
-        message = f"""
-🔔 *New Candidate Ready for Manager Review*
-
-*Candidate:* {candidate_name}
-*Position:* {job_title} at {company}
-*Match Score:* {match_score}% 
-*Status:* Manager Review Needed
-
-📊 *Key Highlights:*
-"""
+        # Collect fragments and join once instead of growing one string
+        parts = [_MANAGER_HEADER.format(
+            candidate_name=candidate_name, job_title=job_title, company=company, match_score=match_score
+        )]
         
         # Add key qualifications
         if 'key_qualifications' in analysis_result:
-            for qual in analysis_result['key_qualifications'][:5]:
-                message += f"• {qual}\n"
+            parts.extend(f"• {qual}\n" for qual in analysis_result['key_qualifications'][:5])
         
         # Add equipment experience
         if 'equipment_brands' in analysis_result:
-            brands = ", ".join(analysis_result['equipment_brands'])
-            message += f"\n*Equipment Experience:* {brands}"
+            parts.append(f"\n*Equipment Experience:* {', '.join(analysis_result['equipment_brands'])}")
         
         # Add years of experience
         if 'total_experience_years' in analysis_result:
-            message += f"\n*Years of Experience:* {analysis_result['total_experience_years']}"
+            parts.append(f"\n*Years of Experience:* {analysis_result['total_experience_years']}")
         
         # Add certifications
         if 'certifications' in analysis_result:
-            certs = ", ".join(analysis_result['certifications'][:3])
-            message += f"\n*Key Certifications:* {certs}"
+            parts.append(f"\n*Key Certifications:* {', '.join(analysis_result['certifications'][:3])}")
         
         # Add action items
-        message += f"""
-
-📋 *Next Steps:*
-1. Review full analysis in CATS
-2. Schedule screening call if interested
-3. Provide feedback in thread below
-
-🔗 *Links:*
-• <https://cats.example.com/candidates/{candidate_info.get('id')}|View in CATS>
-• <https://cats.example.com/jobs/{job_info.get('id')}|View Job Posting>
-"""
+        parts.append(_MANAGER_FOOTER.format(candidate_id=candidate_info.get('id'), job_id=job_info.get('id')))
         
         # Add timestamp
-        message += f"\n\n_Analysis completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}_"
+        stamp = _now or time.strftime('%Y-%m-%d %H:%M:%S')
+        parts.append(f"\n\n_Analysis completed at {stamp}_")
         
-        return message
+        return "".join(parts)
+    
+    def batch_render(self, notifications: List[Tuple[Dict, Dict, Dict]]) -> List[str]:
+        """Format many (candidate_info, analysis_result, job_info) notifications with one shared timestamp"""
+        
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        return [
+            self.format_manager_notification(candidate_info, analysis_result, job_info, _now=stamp)
+            for candidate_info, analysis_result, job_info in notifications
+        ]
     
     def format_analysis_summary(self, analysis_result: Dict) -> str:
         """Format detailed analysis for thread reply"""
         
-        summary = "📄 *Detailed Analysis Summary*\n\n"
+        parts = ["📄 *Detailed Analysis Summary*\n\n"]
         
         # Resume Analysis
         if 'resume_analysis' in analysis_result:
-            summary += "*Resume Highlights:*\n"
+            parts.append("*Resume Highlights:*\n")
             resume = analysis_result['resume_analysis']
             
             if 'current_position' in resume:
-                summary += f"• Current: {resume['current_position']}\n"
+                parts.append(f"• Current: {resume['current_position']}\n")
             
             if 'key_achievements' in resume:
-                summary += "\n*Key Achievements:*\n"
-                for achievement in resume['key_achievements'][:3]:
-                    summary += f"• {achievement}\n"
+                parts.append("\n*Key Achievements:*\n")
+                parts.extend(f"• {achievement}\n" for achievement in resume['key_achievements'][:3])
         
         # Questionnaire Analysis
         if 'questionnaire_analysis' in analysis_result:
-            summary += "\n*Questionnaire Responses:*\n"
+            parts.append("\n*Questionnaire Responses:*\n")
             quest = analysis_result['questionnaire_analysis']
             
             if 'equipment_operated' in quest:
-                summary += f"• Equipment: {', '.join(quest['equipment_operated'])}\n"
+                parts.append(f"• Equipment: {', '.join(quest['equipment_operated'])}\n")
             
             if 'specializations' in quest:
-                summary += f"• Specializations: {', '.join(quest['specializations'])}\n"
+                parts.append(f"• Specializations: {', '.join(quest['specializations'])}\n")
             
             if 'willing_to_relocate' in quest:
-                summary += f"• Willing to Relocate: {'Yes' if quest['willing_to_relocate'] else 'No'}\n"
+                parts.append(f"• Willing to Relocate: {'Yes' if quest['willing_to_relocate'] else 'No'}\n")
         
         # Match Analysis
         if 'match_analysis' in analysis_result:
-            summary += "\n*Job Match Analysis:*\n"
+            parts.append("\n*Job Match Analysis:*\n")
             match = analysis_result['match_analysis']
             
             if 'strengths' in match:
-                summary += "\n✅ *Strengths:*\n"
-                for strength in match['strengths'][:3]:
-                    summary += f"• {strength}\n"
+                parts.append("\n✅ *Strengths:*\n")
+                parts.extend(f"• {strength}\n" for strength in match['strengths'][:3])
             
             if 'gaps' in match:
-                summary += "\n⚠️ *Potential Gaps:*\n"
-                for gap in match['gaps'][:2]:
-                    summary += f"• {gap}\n"
+                parts.append("\n⚠️ *Potential Gaps:*\n")
+                parts.extend(f"• {gap}\n" for gap in match['gaps'][:2])
             
             if 'recommendation' in match:
-                summary += f"\n💡 *AI Recommendation:* {match['recommendation']}\n"
+                parts.append(f"\n💡 *AI Recommendation:* {match['recommendation']}\n")
         
-        return summary
+        return "".join(parts)
     
     def send_notification(self, channel_id: str, message: str) -> Optional[Dict]:
         """Send notification to Slack channel"""
@@ -229,23 +264,43 @@ class SlackNotifier:
             
             # Add detailed analysis as thread reply
             detailed_summary = self.format_analysis_summary(analysis_result)
-            self.send_thread_reply(channel_id, thread_ts, detailed_summary)
             
-            # Add initial reaction to indicate AI processing
-            self.add_reaction(channel_id, thread_ts, "robot_face")
+            # Add initial reaction to indicate AI processing, then priority reaction based on match score
+            reactions = ["robot_face"]
+            _, priority_reaction = score_tier(analysis_result.get('match_score', 0))
+            if priority_reaction:
+                reactions.append(priority_reaction)
             
-            # Add priority reaction based on match score
-            match_score = analysis_result.get('match_score', 0)
-            if match_score >= 90:
-                self.add_reaction(channel_id, thread_ts, "fire")
-            elif match_score >= 75:
-                self.add_reaction(channel_id, thread_ts, "thumbsup")
+            # Reply and reactions only depend on thread_ts, so send them together
+            followups = [_call_executor.submit(self.send_thread_reply, channel_id, thread_ts, detailed_summary)]
+            followups.extend(
+                _call_executor.submit(self.add_reaction, channel_id, thread_ts, reaction)
+                for reaction in reactions
+            )
+            for followup in followups:
+                followup.result()
             
             return thread_ts
             
         except Exception as e:
             logger.error(f"Failed to create recruitment thread: {str(e)}")
             return None
+    
+    def enqueue_recruitment_thread(self,
+                                   channel_id: str,
+                                   candidate_info: Dict,
+                                   analysis_result: Dict,
+                                   job_info: Dict) -> Future:
+        """Run create_recruitment_thread in the background; the future resolves to the thread_ts"""
+        return _thread_executor.submit(
+            self.create_recruitment_thread, channel_id, candidate_info, analysis_result, job_info
+        )
+    
+    @staticmethod
+    def shutdown(wait: bool = False):
+        """Stop the shared notifier pools (call once at process exit)"""
+        _thread_executor.shutdown(wait=wait)
+        _call_executor.shutdown(wait=wait)
 
 
 # Utility functions for Slack formatting
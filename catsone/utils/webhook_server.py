@@ -30,6 +30,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _as_int(value) -> Optional[int]:
+    """Coerce a config or payload ID to int, or None if it isn't one"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Compared on every webhook, so convert once
+MANAGER_REVIEW_STATUS_ID_INT = _as_int(MANAGER_REVIEW_STATUS_ID)
+QUESTIONNAIRE_FIELD_ID_INT = _as_int(QUESTIONNAIRE_FIELD_ID)
+
 # Initialize Flask app
 app = Flask(__name__)
 
@@ -56,13 +69,14 @@ def is_manager_review_status(webhook_data: Dict) -> bool:
     
     # Check for pipeline status change event
     if webhook_data.get('event') == 'candidate.pipeline_status_changed':
-        new_status_id = webhook_data.get('new_status_id')
-        return str(new_status_id) == str(MANAGER_REVIEW_STATUS_ID)
+        new_status_id = _as_int(webhook_data.get('new_status_id'))
+        return new_status_id is not None and new_status_id == MANAGER_REVIEW_STATUS_ID_INT
     
     # Alternative: Check embedded pipeline data
     if '_embedded' in webhook_data and 'pipelines' in webhook_data['_embedded']:
         for pipeline in webhook_data['_embedded']['pipelines']:
-            if str(pipeline.get('status_id')) == str(MANAGER_REVIEW_STATUS_ID):
+            status_id = _as_int(pipeline.get('status_id'))
+            if status_id is not None and status_id == MANAGER_REVIEW_STATUS_ID_INT:
                 return True
     
     return False
@@ -91,7 +105,8 @@ def extract_candidate_info(webhook_data: Dict) -> Dict:
         # Check for questionnaire in custom fields
         if 'custom_fields' in candidate.get('_embedded', {}):
             for field in candidate['_embedded']['custom_fields']:
-                if str(field.get('id')) == str(QUESTIONNAIRE_FIELD_ID):
+                field_id = _as_int(field.get('id'))
+                if field_id is not None and field_id == QUESTIONNAIRE_FIELD_ID_INT:
                     candidate_info['questionnaire_url'] = field.get('value')
                     break
     
@@ -198,8 +213,9 @@ def handle_cats_webhook():
         webhook_data = request.get_json()
         logger.info(f"Received webhook event: {webhook_data.get('event')}")
         
-        # Log full payload for debugging
-        logger.debug(f"Full webhook payload: {json.dumps(webhook_data, indent=2)}")
+        # Log full payload for debugging, serializing only when debug is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Full webhook payload: %s", json.dumps(webhook_data, indent=2))
         
         # Check if this is a manager review status change
         if is_manager_review_status(webhook_data):
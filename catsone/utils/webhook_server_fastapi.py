@@ -12,6 +12,8 @@ from datetime import datetime
 import os
 from typing import Dict, Optional
 import asyncio
+import time
+import httpx
 from contextlib import asynccontextmanager
 
 # Import our modules
@@ -34,12 +36,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _as_int(value) -> Optional[int]:
+    """Coerce a config or payload ID to int, or None if it isn't one"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Compared on every status-change webhook, so convert once
+MANAGER_REVIEW_STATUS_ID_INT = _as_int(MANAGER_REVIEW_STATUS_ID)
+
 # Processing queue
 processing_queue = asyncio.Queue()
 
+# Questionnaire analyses waiting to be linked to a new candidate
+QUESTIONNAIRE_DIR = "/home/gotime2022/recruitment_ops/questionnaire_images"
+_questionnaire_index: Dict[str, tuple] = {}  # *_analysis.json path -> (mtime_ns, lowercased candidate name)
+
+# Candidate records fetched by handlers are reused briefly; created/updated webhooks often arrive back to back
+CANDIDATE_CACHE_TTL = int(os.getenv("CANDIDATE_CACHE_TTL", 30))
+CANDIDATE_CACHE_SIZE = 4096
+_candidate_cache: Dict[int, tuple] = {}  # candidate_id -> (expires_at, record)
+_candidate_locks: Dict[int, asyncio.Lock] = {}
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage app lifecycle - start background processor"""
+    # Connect to Slack before the first notification needs it
+    await slack_webhook.warm()
+    
     # Start background processor
     task = asyncio.create_task(background_processor())
     yield
@@ -49,6 +76,8 @@ async def lifespan(app: FastAPI):
         await task
     except asyncio.CancelledError:
         pass
+    await slack_webhook.close()
+    await close_cats_aclient()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -60,6 +89,88 @@ app = FastAPI(
 # Initialize clients
 cats_client = CATSClient()
 
+# Async pool for the CATS reads made inside request handlers, so they don't block the event loop
+_cats_aclient: Optional[httpx.AsyncClient] = None
+_cats_aclient_loop = None
+
+def _get_cats_aclient() -> httpx.AsyncClient:
+    """Pooled async CATS client for the running event loop"""
+    global _cats_aclient, _cats_aclient_loop
+    
+    loop = asyncio.get_running_loop()
+    if _cats_aclient is None or _cats_aclient_loop is not loop:
+        _cats_aclient = httpx.AsyncClient(
+            headers=cats_client.headers,
+            timeout=15.0,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+        _cats_aclient_loop = loop
+    return _cats_aclient
+
+async def close_cats_aclient():
+    """Close the async CATS pool"""
+    global _cats_aclient, _cats_aclient_loop
+    
+    if _cats_aclient is not None:
+        await _cats_aclient.aclose()
+        _cats_aclient = None
+        _cats_aclient_loop = None
+
+def _cached_candidate(candidate_id: int) -> Optional[Dict]:
+    entry = _candidate_cache.get(candidate_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def _cache_candidate(candidate_id: int, candidate: Dict):
+    now = time.monotonic()
+    if len(_candidate_cache) >= CANDIDATE_CACHE_SIZE:
+        for stale in [cid for cid, entry in _candidate_cache.items() if entry[0] <= now]:
+            del _candidate_cache[stale]
+        # Still full: drop the oldest insertions
+        while len(_candidate_cache) >= CANDIDATE_CACHE_SIZE:
+            del _candidate_cache[next(iter(_candidate_cache))]
+    _candidate_cache[candidate_id] = (now + CANDIDATE_CACHE_TTL, candidate)
+
+def invalidate_candidate(candidate_id: int):
+    """Drop a cached candidate record so the next read refetches it"""
+    _candidate_cache.pop(candidate_id, None)
+
+async def get_candidate_cached(candidate_id: int) -> Optional[Dict]:
+    """Candidate record, reused for CANDIDATE_CACHE_TTL seconds; concurrent misses share one fetch"""
+    candidate = _cached_candidate(candidate_id)
+    if candidate is not None:
+        return candidate
+    
+    lock = _candidate_locks.setdefault(candidate_id, asyncio.Lock())
+    try:
+        async with lock:
+            candidate = _cached_candidate(candidate_id)
+            if candidate is None:
+                candidate = await aget_candidate_details(candidate_id)
+                if candidate is not None:
+                    _cache_candidate(candidate_id, candidate)
+            return candidate
+    finally:
+        # Waiters already hold the lock object; later callers hit the cache
+        if not lock.locked() and _candidate_locks.get(candidate_id) is lock:
+            del _candidate_locks[candidate_id]
+
+async def aget_candidate_details(candidate_id: int) -> Optional[Dict]:
+    """Async get_candidate_details: the candidate record, or None on error"""
+    # Respect the sync client's breaker so a struggling CATS isn't hit from both sides
+    if cats_client.adapter.is_open():
+        logger.error(f"CATS unavailable, not fetching candidate {candidate_id}")
+        return None
+    
+    try:
+        response = await _get_cats_aclient().get(f"{cats_client.base_url}/candidates/{candidate_id}")
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.error(f"Error fetching candidate details: {e}")
+        return None
+
 async def background_processor():
     """Process candidates from queue in background"""
     while True:
@@ -76,7 +187,7 @@ async def handle_candidate_created(candidate_id: int, webhook_data: Dict):
     """Handle new candidate creation - check for questionnaire linking"""
     try:
         # Get candidate details from CATS
-        candidate = cats_client.get_candidate_details(candidate_id)
+        candidate = await get_candidate_cached(candidate_id)
         if not candidate:
             logger.error(f"Could not fetch details for new candidate {candidate_id}")
             return
@@ -93,8 +204,11 @@ async def handle_candidate_created(candidate_id: int, webhook_data: Dict):
 async def handle_candidate_updated(candidate_id: int, webhook_data: Dict):
     """Handle candidate updates - check if questionnaire was attached"""
     try:
+        # The record just changed, so don't reuse a cached copy
+        invalidate_candidate(candidate_id)
+        
         # Check if a questionnaire was attached to this candidate
-        candidate = cats_client.get_candidate_details(candidate_id)
+        candidate = await get_candidate_cached(candidate_id)
         if not candidate:
             return
         
@@ -117,44 +231,67 @@ async def handle_candidate_updated(candidate_id: int, webhook_data: Dict):
     except Exception as e:
         logger.error(f"Error handling candidate update: {e}")
 
+def _refresh_questionnaire_index():
+    """Bring the name index in line with QUESTIONNAIRE_DIR, parsing only new or modified result files"""
+    try:
+        entries = [e for e in os.scandir(QUESTIONNAIRE_DIR) if e.name.endswith('_analysis.json')]
+    except FileNotFoundError:
+        _questionnaire_index.clear()
+        return
+    
+    seen = set()
+    for entry in entries:
+        path = entry.path
+        seen.add(path)
+        try:
+            mtime = entry.stat().st_mtime_ns
+            cached = _questionnaire_index.get(path)
+            if cached and cached[0] == mtime:
+                continue
+            with open(path, 'r') as f:
+                analysis = json.load(f)
+            name = analysis.get('candidate_profile', {}).get('candidate_info', {}).get('name', '')
+            _questionnaire_index[path] = (mtime, name.lower())
+        except Exception as e:
+            # Possibly still being written; it's retried once its mtime changes
+            logger.error(f"Error processing questionnaire file {path}: {e}")
+            _questionnaire_index[path] = (mtime, '')
+    
+    for path in [p for p in _questionnaire_index if p not in seen]:
+        del _questionnaire_index[path]
+
 async def check_pending_questionnaires(candidate_id: int, candidate_name: str):
     """Check for questionnaires waiting to be linked to this candidate"""
     try:
-        import os
-        import glob
-        
-        # Check for questionnaire files in processing directory
-        questionnaire_dir = "/home/gotime2022/recruitment_ops/questionnaire_images"
-        if os.path.exists(questionnaire_dir):
-            # Look for processed questionnaire results
-            result_files = glob.glob(f"{questionnaire_dir}/*_analysis.json")
+        _refresh_questionnaire_index()
+        
+        candidate_lower = candidate_name.lower()
+        for result_file, (_, questionnaire_name) in list(_questionnaire_index.items()):
+            if not questionnaire_name or not candidate_name:
+                continue
             
-            for result_file in result_files:
+            # Simple name matching (can be enhanced)
+            if questionnaire_name in candidate_lower or candidate_lower in questionnaire_name:
+                logger.info(f"Found matching questionnaire for {candidate_name}: {result_file}")
+                
                 try:
-                    import json
+                    # Only the matched file is loaded in full
                     with open(result_file, 'r') as f:
                         analysis = json.load(f)
                     
-                    # Check if this questionnaire matches the new candidate
-                    questionnaire_name = analysis.get('candidate_profile', {}).get('candidate_info', {}).get('name', '')
+                    # Process this candidate with the linked questionnaire
+                    await processing_queue.put({
+                        'candidate_id': candidate_id,
+                        'event_type': 'questionnaire.linked',
+                        'questionnaire_analysis': analysis,
+                        'data': {'auto_linked': True}
+                    })
                     
-                    if questionnaire_name and candidate_name:
-                        # Simple name matching (can be enhanced)
-                        if questionnaire_name.lower() in candidate_name.lower() or candidate_name.lower() in questionnaire_name.lower():
-                            logger.info(f"Found matching questionnaire for {candidate_name}: {result_file}")
-                            
-                            # Process this candidate with the linked questionnaire
-                            await processing_queue.put({
-                                'candidate_id': candidate_id,
-                                'event_type': 'questionnaire.linked',
-                                'questionnaire_analysis': analysis,
-                                'data': {'auto_linked': True}
-                            })
-                            
-                            # Remove the processed file
-                            os.remove(result_file)
-                            break
-                            
+                    # Remove the processed file
+                    os.remove(result_file)
+                    _questionnaire_index.pop(result_file, None)
+                    break
+                
                 except Exception as e:
                     logger.error(f"Error processing questionnaire file {result_file}: {e}")
         
@@ -266,8 +403,8 @@ async def handle_candidate_webhook(request: Request, background_tasks: Backgroun
         
         elif event_type == 'pipeline.status_changed':
             # Status change to "manager review needed"
-            new_status = data.get('pipeline', {}).get('status_id')
-            if new_status == MANAGER_REVIEW_STATUS_ID:
+            new_status = _as_int(data.get('pipeline', {}).get('status_id'))
+            if new_status is not None and new_status == MANAGER_REVIEW_STATUS_ID_INT:
                 # Queue for processing
                 await processing_queue.put({
                     'candidate_id': candidate_id,
@@ -347,7 +484,7 @@ async def manual_process_candidate(candidate_id: int):
     
     try:
         # Get candidate details to verify they exist
-        candidate = cats_client.get_candidate_details(candidate_id)
+        candidate = await get_candidate_cached(candidate_id)
         if not candidate:
             raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} not found")
         
@@ -388,7 +525,7 @@ async def manual_link_questionnaire(candidate_id: int, request: Request):
             raise HTTPException(status_code=400, detail="Missing questionnaire_analysis")
         
         # Verify candidate exists
-        candidate = cats_client.get_candidate_details(candidate_id)
+        candidate = await get_candidate_cached(candidate_id)
         if not candidate:
             raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} not found")
         
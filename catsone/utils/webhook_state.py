@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Webhook State - Dedupe keys and per-candidate locks in SQLite
+Shared by every webhook worker process on the host, so a redelivery that lands
+on another worker is still recognised and a candidate is processed by one worker at a time
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+sys.path.append('/home/gotime2022/recruitment_ops')
+from catsone.config import WEBHOOK_STATE_DB, CANDIDATE_LOCK_TTL
+
+logger = logging.getLogger(__name__)
+
+LOCK_POLL_INTERVAL = 0.2  # seconds between attempts to take a lock another worker holds
+PURGE_EVERY = 500  # writes between sweeps of expired keys
+
+class WebhookState:
+    """Expiring keys and lease locks stored in a SQLite file"""
+    
+    def __init__(self, db_path: str = WEBHOOK_STATE_DB):
+        self.db_path = db_path
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        self._lock = threading.Lock()
+        self._writes = 0
+        # timeout: wait for another process's write instead of failing with "database is locked"
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS webhook_seen (key TEXT PRIMARY KEY, expires_at REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS webhook_locks (name TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+    
+    def seen(self, key: str) -> bool:
+        """True if key was marked and hasn't expired"""
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM webhook_seen WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] > time.time()
+    
+    def mark(self, key: str, ttl: float):
+        """Remember key for ttl seconds"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO webhook_seen (key, expires_at) VALUES (?, ?)", (key, now + ttl)
+            )
+            self._purge(now)
+    
+    def claim(self, key: str, ttl: float) -> bool:
+        """Mark key unless it is already live; True if this caller got it (atomic across processes)"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO webhook_seen (key, expires_at) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at "
+                "WHERE webhook_seen.expires_at <= ?",
+                (key, now + ttl, now)
+            )
+            self._purge(now)
+        return cursor.rowcount == 1
+    
+    def forget(self, key: str):
+        """Drop key so the next seen() check misses"""
+        with self._lock:
+            self._conn.execute("DELETE FROM webhook_seen WHERE key = ?", (key,))
+    
+    @contextmanager
+    def lock(self, name: str, ttl: float = CANDIDATE_LOCK_TTL):
+        """Hold a named lease lock; one holder across all processes until release or ttl"""
+        while not self._try_lock(name, ttl):
+            time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._conn.execute("DELETE FROM webhook_locks WHERE name = ? AND owner = ?", (name, self.owner))
+    
+    def _try_lock(self, name: str, ttl: float) -> bool:
+        # An expired lease belongs to a worker that died mid-run, so it can be taken over
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO webhook_locks (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE webhook_locks.expires_at <= ?",
+                (name, self.owner, now + ttl, now)
+            )
+        return cursor.rowcount == 1
+    
+    def _purge(self, now: float):
+        # Called under self._lock; keeps the table bounded
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self._conn.execute("DELETE FROM webhook_seen WHERE expires_at <= ?", (now,))
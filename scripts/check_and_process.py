@@ -4,9 +4,8 @@ Check for candidates with the questionnaire tag and process them
 Run this periodically (cron job) or manually
 """
 
-import os
 import sys
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -15,17 +14,42 @@ load_dotenv()
 sys.path.append('/home/gotime2022/recruitment_ops')
 from catsone.integration.cats_integration import CATSClient
 
+QUESTIONNAIRE_TAG = 'Questionnaire Completed'
+QUESTIONNAIRE_TAG_LOWER = QUESTIONNAIRE_TAG.lower()
+RECENT_CANDIDATES = 100  # how far back (by date modified) each check looks
+TAG_FETCH_WORKERS = 16  # concurrent tag lookups in the fallback scan
+
+def is_unprocessed(candidate):
+    """Processed candidates have the AI analysis written into their notes"""
+    return not candidate.get('notes') or len(candidate.get('notes', '')) < 100
+
+def tagged_candidate(candidate, tag_title):
+    return {
+        'id': candidate['id'],
+        'name': f"{candidate['first_name']} {candidate['last_name']}",
+        'tag': tag_title
+    }
+
 def check_for_tagged_candidates():
     """Find all candidates with 'Questionnaire Completed' tag"""
     
     client = CATSClient()
-    api_key = os.getenv('CATS_API_KEY')
     
-    # Get all candidates (you might want to filter by date)
-    url = f"{client.base_url}/candidates?per_page=100&sort=-date_modified"
-    headers = {"Authorization": f"Token {api_key}", "Accept": "application/json"}
+    # One filtered search over every "...questionnaire completed" tag variant,
+    # limited to the most recently modified tagged candidates
+    candidates = client.list_candidates_by_tag(QUESTIONNAIRE_TAG_LOWER, limit=RECENT_CANDIDATES)
+    if candidates is None:
+        print("Tag filter unavailable, checking tags of recent candidates")
+        return scan_recent_candidates(client)
+    
+    return [tagged_candidate(c, QUESTIONNAIRE_TAG) for c in candidates if is_unprocessed(c)]
+
+def scan_recent_candidates(client):
+    """Fallback: check the tags of the RECENT_CANDIDATES most recently modified candidates"""
     
-    response = requests.get(url, headers=headers)
+    # The client's pooled session keeps one keep-alive connection (and its retries) for every call
+    url = f"{client.base_url}/candidates?per_page={RECENT_CANDIDATES}&sort=-date_modified"
+    response = client.session.get(url)
     if response.status_code != 200:
         print(f"Error getting candidates: {response.status_code}")
         return []
@@ -33,28 +57,28 @@ def check_for_tagged_candidates():
     candidates = response.json().get('_embedded', {}).get('candidates', [])
     tagged_candidates = []
     
-    # Check each candidate for the tag
-    for candidate in candidates:
-        candidate_id = candidate['id']
-        
-        # Get tags for this candidate
-        tags_url = f"{client.base_url}/candidates/{candidate_id}/tags"
-        tags_response = requests.get(tags_url, headers=headers)
+    def fetch_tags(candidate_id):
+        """Tags for one candidate, or None if CATS didn't return them"""
+        try:
+            tags_response = client.session.get(f"{client.base_url}/candidates/{candidate_id}/tags")
+        except Exception as e:
+            print(f"Error getting tags for candidate {candidate_id}: {e}")
+            return None
+        if tags_response.status_code != 200:
+            return None
+        return tags_response.json().get('_embedded', {}).get('tags', [])
+    
+    # Tag lookups are pure network waits, so run them side by side; map keeps candidate order
+    with ThreadPoolExecutor(max_workers=TAG_FETCH_WORKERS) as executor:
+        all_tags = executor.map(fetch_tags, [c['id'] for c in candidates])
         
-        if tags_response.status_code == 200:
-            tags_data = tags_response.json()
-            tags = tags_data.get('_embedded', {}).get('tags', [])
-            
+        for candidate, tags in zip(candidates, all_tags):
             # Check for questionnaire completed tag
-            for tag in tags:
-                if 'questionnaire completed' in tag.get('title', '').lower():
+            for tag in tags or []:
+                if QUESTIONNAIRE_TAG_LOWER in tag.get('title', '').lower():
                     # Check if already processed (by looking at notes)
-                    if not candidate.get('notes') or len(candidate.get('notes', '')) < 100:
-                        tagged_candidates.append({
-                            'id': candidate_id,
-                            'name': f"{candidate['first_name']} {candidate['last_name']}",
-                            'tag': tag['title']
-                        })
+                    if is_unprocessed(candidate):
+                        tagged_candidates.append(tagged_candidate(candidate, tag['title']))
                     break
     
     return tagged_candidates
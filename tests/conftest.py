@@ -0,0 +1,12 @@
+"""
+Shared pytest setup: make the catsone package importable from the repo root
+"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# webhook_handler exits at import without an Anthropic key; tests never call the API
+os.environ.setdefault('ANTHROPIC_API_KEY', 'test-key-not-used')
@@ -0,0 +1,111 @@
+"""
+Tests for the SQLite FTS5 name index and its use in catsone/utils/candidate_matcher.py
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip('requests')
+
+from catsone.utils import candidate_matcher as cm
+from catsone.utils.candidate_index import CandidateNameIndex
+
+
+def fts5_available():
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason="SQLite built without FTS5")
+
+CANDIDATES = [
+    {'id': 1, 'first_name': 'Gaétan', 'last_name': 'Desrochers'},
+    {'id': 2, 'first_name': 'Gaetan', 'last_name': 'Tremblay'},
+    {'id': 3, 'first_name': 'Zoë', 'last_name': 'Lefèvre'},
+]
+
+
+class FakeCATS:
+    base_url = 'https://cats.test/v3'
+    
+    def __init__(self, records):
+        self.records = {r['id']: r for r in records}
+        self.detail_calls = []
+    
+    def search_candidates(self, query):
+        return {'_embedded': {'candidates': []}}
+    
+    def get_candidate_details(self, candidate_id):
+        self.detail_calls.append(candidate_id)
+        return self.records.get(candidate_id)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CandidateNameIndex(str(tmp_path / 'candidates.db'))
+    index.rebuild(CANDIDATES)
+    return index
+
+
+def test_lookup_folds_accents_both_ways(index):
+    assert index.lookup('gaetan', 'desrochers') == [1]
+    assert index.lookup('Gaétan', 'Desrochers') == [1]
+    assert index.lookup('zoe', 'lefevre') == [3]
+    assert sorted(index.lookup('gaet', 'd')) == [1]
+
+
+def test_lookup_quotes_query_syntax(index):
+    assert index.lookup('gaetan" OR "', 'x') == []
+
+
+def test_freshness_follows_rebuild_time(index):
+    assert index.is_fresh(max_age=60)
+    assert not index.is_fresh(max_age=0)
+
+
+def test_matcher_uses_fresh_index_before_scanning(index, monkeypatch):
+    cats = FakeCATS(CANDIDATES)
+    matcher = cm.CandidateMatcher(cats, name_index=index)
+    monkeypatch.setattr(matcher, '_scan_cats_candidates', lambda is_match: pytest.fail("scanned CATS"))
+    
+    found = matcher._search_cats_candidates({'first_name': 'Gaetan', 'last_name': 'Desrochers'})
+    assert [c['id'] for c in found] == [1]
+    assert cats.detail_calls == [1]
+
+
+def test_stale_index_schedules_refresh_and_falls_back(index, monkeypatch):
+    monkeypatch.setattr(index, 'is_fresh', lambda max_age=None: False)
+    matcher = cm.CandidateMatcher(FakeCATS(CANDIDATES), name_index=index)
+    scheduled = []
+    monkeypatch.setattr(matcher, 'schedule_index_refresh', lambda: scheduled.append(True))
+    monkeypatch.setattr(matcher, '_scan_cats_candidates', lambda is_match: [CANDIDATES[0]])
+    
+    assert matcher._search_cats_candidates({'first_name': 'Gaétan', 'last_name': 'Desrochers'}) == [CANDIDATES[0]]
+    assert scheduled == [True]
+
+
+def test_only_one_background_refresh_runs_at_a_time(index, monkeypatch):
+    release = threading.Event()
+    matcher = cm.CandidateMatcher(FakeCATS(CANDIDATES), name_index=index)
+    monkeypatch.setattr(matcher, 'refresh_name_index', release.wait)
+    monkeypatch.setattr(cm, '_refresh_thread', None)
+    
+    assert matcher.schedule_index_refresh()
+    assert not matcher.schedule_index_refresh()
+    release.set()
+    cm._refresh_thread.join(1)
+    assert matcher.schedule_index_refresh()
+    cm._refresh_thread.join(1)
+
+
+def test_matchers_share_one_index_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(cm, '_shared_index', CandidateNameIndex(str(tmp_path / 'shared.db')))
+    assert cm.CandidateMatcher(FakeCATS([])).name_index is cm.CandidateMatcher(FakeCATS([])).name_index
@@ -0,0 +1,135 @@
+"""
+Tests for the CATS rate limit and circuit breaker in catsone/integration/cats_integration.py
+"""
+
+import threading
+import types
+
+import pytest
+
+pytest.importorskip('requests')
+
+from catsone.integration import cats_integration as ci
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Swap the module's time reference only; sleeps just advance the fake clock
+    clock = types.SimpleNamespace(now=1000.0, sleeps=[])
+    
+    def sleep(seconds):
+        clock.sleeps.append(seconds)
+        clock.now += seconds
+    
+    monkeypatch.setattr(ci, 'time', types.SimpleNamespace(monotonic=lambda: clock.now, sleep=sleep))
+    return clock
+
+
+@pytest.fixture
+def cats(monkeypatch):
+    """Adapter whose transport returns the status codes queued in cats.statuses"""
+    statuses = []
+    
+    def send(self, request, **kwargs):
+        status = statuses.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status)
+    
+    monkeypatch.setattr(ci.HTTPAdapter, 'send', send)
+    adapter = ci.GuardedAdapter(max_rps=100, fail_max=2, reset_timeout=30, max_token_wait=1)
+    adapter.statuses = statuses
+    return adapter
+
+
+def test_opens_after_consecutive_failures(clock, cats):
+    cats.statuses.extend([500, ci.requests.exceptions.ConnectionError("down")])
+    cats.send(None)
+    assert not cats.is_open()
+    with pytest.raises(ci.requests.exceptions.ConnectionError):
+        cats.send(None)
+    
+    assert cats.is_open()
+    assert cats.retry_after() == 31
+    with pytest.raises(ci.CATSUnavailableError):
+        cats.send(None)
+
+
+def test_half_open_admits_a_single_trial(monkeypatch, clock, cats):
+    cats.statuses.extend([500, 500])
+    cats.send(None)
+    cats.send(None)
+    clock.now += 30
+    assert not cats.is_open()
+    
+    started, release = threading.Event(), threading.Event()
+    
+    def slow_send(self, request, **kwargs):
+        started.set()
+        release.wait(5)
+        return FakeResponse(200)
+    
+    monkeypatch.setattr(ci.HTTPAdapter, 'send', slow_send)
+    trial = threading.Thread(target=cats.send, args=(None,))
+    trial.start()
+    assert started.wait(5)
+    
+    # Everyone else fails fast while the trial is out
+    assert cats.is_open()
+    with pytest.raises(ci.CATSUnavailableError):
+        cats.send(None)
+    
+    release.set()
+    trial.join(5)
+    assert not cats.is_open()
+    assert cats.send(None).status_code == 200
+
+
+def test_failed_trial_reopens_for_a_full_timeout(clock, cats):
+    cats.statuses.extend([500, 500, 503])
+    cats.send(None)
+    cats.send(None)
+    clock.now += 30
+    cats.send(None)
+    
+    assert cats.is_open()
+    assert cats.retry_after() == 31
+    clock.now += 29
+    with pytest.raises(ci.CATSUnavailableError):
+        cats.send(None)
+
+
+def test_token_wait_is_capped(clock, cats):
+    cats.max_rps = 2
+    cats._tokens = 0.0
+    cats.statuses.extend([200, 200])
+    
+    cats.send(None)
+    cats.send(None)
+    assert clock.sleeps == [0.5, 0.5]
+    
+    # With more than max_token_wait queued ahead, fail rather than sleep
+    cats._tokens, cats._last_refill = -2.0, clock.now
+    with pytest.raises(ci.CATSRateLimitedError):
+        cats.send(None)
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_rate_limited_trial_frees_the_trial_slot(clock, cats):
+    cats.statuses.extend([500, 500, 200])
+    cats.send(None)
+    cats.send(None)
+    clock.now += 30
+    
+    cats._tokens, cats._last_refill = -1000.0, clock.now
+    with pytest.raises(ci.CATSRateLimitedError):
+        cats.send(None)
+    
+    cats._tokens = 1.0
+    assert cats.send(None).status_code == 200
+    assert not cats.is_open()
@@ -0,0 +1,78 @@
+"""
+Tests for the tag-filtered candidate search in catsone/integration/cats_integration.py
+"""
+
+import pytest
+
+pytest.importorskip('requests')
+
+from catsone.integration import cats_integration as ci
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, tags, candidate_pages):
+        self.tags = tags
+        self.candidate_pages = list(candidate_pages)
+        self.searches = []
+    
+    def get(self, url, params=None):
+        return FakeResponse({'_embedded': {'tags': self.tags}})
+    
+    def post(self, url, params=None, json=None):
+        self.searches.append(json)
+        page = self.candidate_pages.pop(0)
+        links = {'next': {'href': f'{url}?page=next'}} if self.candidate_pages else {}
+        return FakeResponse({'_embedded': {'candidates': page}, '_links': links})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(ci, '_tag_ids', {})
+    client = ci.CATSClient.__new__(ci.CATSClient)
+    client.base_url = 'https://cats.test/v3'
+    return client
+
+
+def test_every_tag_containing_the_phrase_is_searched(client):
+    client.session = FakeSession(
+        tags=[
+            {'id': 1, 'title': 'Questionnaire Completed'},
+            {'id': 2, 'title': 'Application Status: Questionnaire Completed'},
+            {'id': 3, 'title': 'Interview Booked'},
+        ],
+        candidate_pages=[[{'id': 10}]]
+    )
+    
+    assert sorted(client.get_tag_ids('questionnaire completed')) == [1, 2]
+    assert client.list_candidates_by_tag('questionnaire completed') == [{'id': 10}]
+    assert client.session.searches == [{'or': [
+        {'field': 'tag_id', 'filter': 'exactly', 'value': 1},
+        {'field': 'tag_id', 'filter': 'exactly', 'value': 2},
+    ]}]
+
+
+def test_search_stops_at_limit(client):
+    client.session = FakeSession(
+        tags=[{'id': 1, 'title': 'Questionnaire Completed'}],
+        candidate_pages=[[{'id': i} for i in range(3)], [{'id': i} for i in range(3, 6)], [{'id': 99}]]
+    )
+    
+    candidates = client.list_candidates_by_tag('questionnaire completed', limit=4, page_size=3)
+    assert [c['id'] for c in candidates] == [0, 1, 2, 3]
+    assert len(client.session.searches) == 2
+
+
+def test_missing_tag_returns_none_for_fallback(client):
+    client.session = FakeSession(tags=[{'id': 3, 'title': 'Interview Booked'}], candidate_pages=[])
+    assert client.list_candidates_by_tag('questionnaire completed') is None
@@ -0,0 +1,94 @@
+"""
+Tests for the MCP circuit breaker in catsone/utils/mcp_slack_client.py
+"""
+
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from catsone.utils import mcp_slack_client as mcp
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Swap the module's time reference only; asyncio's own clock must keep running
+    now = [1000.0]
+    monkeypatch.setattr(mcp, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_opens_after_threshold_and_half_opens_after_timeout(clock):
+    breaker = mcp._CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    assert breaker.record_failure() and breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    
+    clock[0] += 30
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only the one trial call goes out while half-open
+    assert not breaker.allow()
+
+
+def test_half_open_trial_outcome(clock):
+    breaker = mcp._CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.fail_count == 0
+    assert breaker.allow()
+
+
+def test_cancelled_half_open_trial_reopens_circuit(clock, monkeypatch):
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(3600)
+    
+    monkeypatch.setattr(mcp, 'post_with_retry', hang)
+    client = mcp.MCPSlackClient()
+    client.breaker = mcp._CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    client.breaker.record_failure()
+    clock[0] += 10
+    
+    async def trial():
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client._call_mcp_tool("slack_post_message", {}), 0.01)
+        finally:
+            await client.close()
+    
+    asyncio.run(trial())
+    assert client.breaker.state == "open"
+    assert client.in_flight == 0
+    
+    # The next trial is let through once the cooldown passes again
+    clock[0] += 10
+    assert client.breaker.allow()
+
+
+def test_cancelled_call_while_closed_is_not_a_failure(monkeypatch):
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(3600)
+    
+    monkeypatch.setattr(mcp, 'post_with_retry', hang)
+    client = mcp.MCPSlackClient()
+    
+    async def call():
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client._call_mcp_tool("slack_post_message", {}), 0.01)
+        finally:
+            await client.close()
+    
+    asyncio.run(call())
+    assert client.breaker.state == "closed" and client.breaker.fail_count == 0
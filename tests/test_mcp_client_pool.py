@@ -0,0 +1,67 @@
+"""
+Tests for the per-event-loop HTTP pool in catsone/utils/mcp_slack_client.py
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from catsone.utils import mcp_slack_client as mcp
+
+
+def test_client_from_an_idle_loop_is_closed_on_that_loop():
+    client = mcp.MCPSlackClient()
+    old_loop = asyncio.new_event_loop()
+    try:
+        first = old_loop.run_until_complete(client._get_client())
+        
+        async def on_new_loop():
+            second = await client._get_client()
+            await client.close()
+            return second
+        
+        second = asyncio.run(on_new_loop())
+        assert second is not first
+        assert first.is_closed
+    finally:
+        old_loop.close()
+
+
+def test_client_from_a_running_loop_is_closed_there():
+    client = mcp.MCPSlackClient()
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever)
+    thread.start()
+    try:
+        first = asyncio.run_coroutine_threadsafe(client._get_client(), other_loop).result(5)
+        
+        async def on_new_loop():
+            await client._get_client()
+            await client.close()
+        
+        asyncio.run(on_new_loop())
+        # The close was handed to the other loop; wait for it to run there
+        deadline = time.monotonic() + 5
+        while not first.is_closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert first.is_closed
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(5)
+        other_loop.close()
+
+
+def test_client_from_a_closed_loop_is_dropped_quietly():
+    client = mcp.MCPSlackClient()
+    first = asyncio.run(client._get_client())
+    
+    async def on_new_loop():
+        second = await client._get_client()
+        await client.close()
+        return second
+    
+    assert asyncio.run(on_new_loop()) is not first
@@ -0,0 +1,114 @@
+"""
+Tests for candidate notification dedupe in catsone/utils/mcp_slack_client.py
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('httpx')
+pytest.importorskip('requests')
+
+from catsone.utils import mcp_slack_client as mcp
+
+CANDIDATE = {'id': 42, 'first_name': 'Gaétan', 'last_name': 'Desrochers'}
+ANALYSIS = {'match_score': 82}
+JOB = {'id': 7, 'title': 'Heavy Equipment Technician'}
+
+
+def make_client(monkeypatch, result):
+    client = mcp.MCPSlackClient()
+    posts = []
+    
+    async def post_message(text, channel=None, job_type=None, urgency="normal", blocks=None):
+        posts.append(channel)
+        await asyncio.sleep(0.01)
+        return dict(result)
+    
+    async def no_followups(*args):
+        pass
+    
+    monkeypatch.setattr(client, 'post_message', post_message)
+    monkeypatch.setattr(client, '_post_thread_followups', no_followups)
+    return client, posts
+
+
+def notify(client):
+    return client.post_candidate_notification(CANDIDATE, ANALYSIS, JOB)
+
+
+def test_concurrent_sends_post_once(monkeypatch):
+    client, posts = make_client(monkeypatch, {'success': True, 'timestamp': '111.222'})
+    
+    async def burst():
+        return await asyncio.gather(*(notify(client) for _ in range(5)))
+    
+    assert asyncio.run(burst()) == ['111.222'] * 5
+    assert len(posts) == 1
+    assert asyncio.run(notify(client)) == '111.222'
+    assert len(posts) == 1
+
+
+def test_webhook_fallback_post_is_remembered(monkeypatch):
+    client, posts = make_client(monkeypatch, {'success': True, 'fallback': True})
+    
+    assert asyncio.run(notify(client)) is None
+    assert asyncio.run(notify(client)) is None
+    assert len(posts) == 1
+
+
+def test_failed_post_is_retried(monkeypatch):
+    client, posts = make_client(monkeypatch, {'success': False, 'error': 'down'})
+    
+    asyncio.run(notify(client))
+    asyncio.run(notify(client))
+    assert len(posts) == 2
+    assert client._sending == {}
+
+
+class CountingBucket:
+    def __init__(self, client):
+        self.client = client
+        self.acquired = []
+    
+    async def acquire(self):
+        # Record whether an MCP slot was already held when the token was taken
+        self.acquired.append(self.client.in_flight)
+
+
+def test_only_the_visible_post_is_rate_limited(monkeypatch):
+    client = mcp.MCPSlackClient()
+    bucket = CountingBucket(client)
+    monkeypatch.setattr(mcp, 'slack_rate_limit', bucket)
+    monkeypatch.setenv('SLACK_WEBHOOK_URL', 'https://hooks.example/a')
+    tools = []
+    
+    async def send(tool_name, params):
+        tools.append(tool_name)
+        if tool_name == "slack_post_message":
+            return {'success': True, 'timestamp': '111.222'}
+        return {'ok': True}
+    
+    async def webhook(client_, url, rate_limit=None, **kwargs):
+        assert rate_limit is None
+        tools.append('webhook')
+        return type('Response', (), {'status_code': 200})()
+    
+    monkeypatch.setattr(client, '_send_mcp_tool', send)
+    monkeypatch.setattr(mcp, 'post_with_retry', webhook)
+    
+    async def run():
+        try:
+            await notify(client)
+            # A post that fails over to the webhook is still charged only once
+            monkeypatch.setattr(client, '_send_mcp_tool', mcp_busy)
+            await client.post_message("hello", channel="#recruitment-notifications")
+        finally:
+            await client.close()
+    
+    async def mcp_busy(tool_name, params):
+        raise mcp.MCPBusy("busy")
+    
+    asyncio.run(run())
+    assert tools == ["slack_post_message", "slack_reply_to_thread", "slack_add_reaction", "webhook"]
+    assert bucket.acquired == [0, 0]
@@ -0,0 +1,113 @@
+"""
+Tests for the questionnaire name index in catsone/utils/webhook_server_fastapi.py
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+import types
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('httpx')
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CATSONE_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'catsone')
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    # The server imports its siblings as top-level packages from catsone/;
+    # processors.process_candidate is not in the tree, so stand in for it.
+    # The regular package tests/integration would win over the namespace
+    # package catsone/integration, so take tests/ off the path.
+    monkeypatch.setattr(sys, 'path', [p for p in sys.path if os.path.abspath(p or '.') != TESTS_DIR])
+    monkeypatch.syspath_prepend(CATSONE_DIR)
+    monkeypatch.delitem(sys.modules, 'integration', raising=False)
+    stub = types.ModuleType('processors.process_candidate')
+    stub.process_single_candidate = lambda *args, **kwargs: None
+    monkeypatch.setitem(sys.modules, 'processors.process_candidate', stub)
+    ws = importlib.import_module('utils.webhook_server_fastapi')
+    
+    loads = []
+    
+    def counting_load(f):
+        loads.append(f.name)
+        return json.load(f)
+    
+    monkeypatch.setattr(ws, 'QUESTIONNAIRE_DIR', str(tmp_path))
+    monkeypatch.setattr(ws, '_questionnaire_index', {})
+    monkeypatch.setattr(ws, 'processing_queue', asyncio.Queue())
+    monkeypatch.setattr(ws, 'json', types.SimpleNamespace(load=counting_load))
+    ws.loads = loads
+    return ws
+
+
+def write_result(directory, filename, name, mtime_ns=None):
+    path = directory / filename
+    path.write_text(json.dumps({'candidate_profile': {'candidate_info': {'name': name}}}))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def test_only_new_or_modified_files_are_parsed(server, tmp_path):
+    first = write_result(tmp_path, 'a_analysis.json', 'Gaétan Desrochers', 1_000_000_000)
+    second = write_result(tmp_path, 'b_analysis.json', 'Jane Smith', 1_000_000_000)
+    (tmp_path / 'notes.txt').write_text('ignored')
+    
+    server._refresh_questionnaire_index()
+    assert sorted(server.loads) == sorted([first, second])
+    assert server._questionnaire_index[first] == (1_000_000_000, 'gaétan desrochers')
+    
+    server.loads.clear()
+    server._refresh_questionnaire_index()
+    assert server.loads == []
+    
+    write_result(tmp_path, 'b_analysis.json', 'Janet Smith', 2_000_000_000)
+    server._refresh_questionnaire_index()
+    assert server.loads == [second]
+    assert server._questionnaire_index[second] == (2_000_000_000, 'janet smith')
+
+
+def test_deleted_files_are_dropped(server, tmp_path):
+    path = write_result(tmp_path, 'a_analysis.json', 'Jane Smith')
+    server._refresh_questionnaire_index()
+    
+    os.remove(path)
+    server._refresh_questionnaire_index()
+    assert server._questionnaire_index == {}
+
+
+def test_unreadable_file_is_retried_after_its_mtime_changes(server, tmp_path):
+    path = tmp_path / 'a_analysis.json'
+    path.write_text('{"candidate_profile": ')
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    
+    server._refresh_questionnaire_index()
+    server._refresh_questionnaire_index()
+    assert server._questionnaire_index[str(path)] == (1_000_000_000, '')
+    assert server.loads == [str(path)]
+    
+    write_result(tmp_path, 'a_analysis.json', 'Jane Smith', 2_000_000_000)
+    server._refresh_questionnaire_index()
+    assert server._questionnaire_index[str(path)] == (2_000_000_000, 'jane smith')
+
+
+def test_matched_questionnaire_is_queued_and_removed(server, tmp_path):
+    matched = write_result(tmp_path, 'a_analysis.json', 'Jane Smith')
+    other = write_result(tmp_path, 'b_analysis.json', 'Bob Jones')
+    
+    asyncio.run(server.check_pending_questionnaires(42, 'Jane Smith'))
+    
+    queued = server.processing_queue.get_nowait()
+    assert queued['candidate_id'] == 42
+    assert queued['event_type'] == 'questionnaire.linked'
+    assert queued['questionnaire_analysis']['candidate_profile']['candidate_info']['name'] == 'Jane Smith'
+    assert server.processing_queue.empty()
+    
+    assert not os.path.exists(matched)
+    assert list(server._questionnaire_index) == [other]
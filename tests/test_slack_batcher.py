@@ -0,0 +1,64 @@
+"""
+Tests for the process-wide Slack digest batcher in catsone/utils/slack_batcher.py
+"""
+
+import pytest
+
+pytest.importorskip('requests')
+
+from catsone.utils import slack_batcher as sb
+
+
+class FakeResponse:
+    status_code = 200
+
+
+class FakeSession:
+    def __init__(self):
+        self.posts = []
+    
+    def post(self, url, json=None, timeout=None):
+        self.posts.append(json)
+        return FakeResponse()
+
+
+def message(text):
+    return {'text': text, 'blocks': [{'type': 'section', 'text': {'type': 'mrkdwn', 'text': text}}]}
+
+
+def test_one_batcher_per_webhook_url(monkeypatch):
+    monkeypatch.setattr(sb, '_batchers', {})
+    first = sb.get_batcher('https://hooks.example/a')
+    assert sb.get_batcher('https://hooks.example/a') is first
+    assert sb.get_batcher('https://hooks.example/b') is not first
+    # No thread until something is queued
+    assert first._worker is None
+
+
+def test_burst_is_posted_as_one_digest_per_channel():
+    batcher = sb.SlackBatcher('https://hooks.example/a', flush_interval=5)
+    batcher.session = FakeSession()
+    
+    batcher.enqueue(message('one'), channel='#equipment-operators')
+    batcher.enqueue(message('two'), channel='#hiring-managers')
+    batcher.enqueue(message('three'), channel='#equipment-operators')
+    batcher.close()
+    
+    posts = batcher.session.posts
+    assert [post['channel'] for post in posts] == ['#equipment-operators', '#hiring-managers']
+    assert posts[0]['text'] == "one\nthree"
+    assert [block['type'] for block in posts[0]['blocks']] == ['section', 'divider', 'section']
+    assert posts[1]['text'] == "two"
+
+
+def test_worker_restarts_after_close():
+    batcher = sb.SlackBatcher('https://hooks.example/a', flush_interval=5)
+    batcher.session = FakeSession()
+    
+    batcher.enqueue(message('one'))
+    batcher.close()
+    batcher.enqueue(message('two'))
+    batcher.close()
+    
+    assert [post['text'] for post in batcher.session.posts] == ['one', 'two']
+    assert 'channel' not in batcher.session.posts[0]
@@ -0,0 +1,86 @@
+"""
+Tests for Flash -> Pro escalation and the page cache in catsone/processors/vision_questionnaire_analyzer.py
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip('google.generativeai')
+Image = pytest.importorskip('PIL.Image')
+
+from catsone.processors import vision_questionnaire_analyzer as vqa
+
+ANSWERED = {'questions_and_responses': [
+    {'question': 'Red Seal?', 'all_available_options': ['Yes', 'No'], 'actual_selections': ['Yes']}
+]}
+BLANK = {'questions_and_responses': [
+    {'question': 'Red Seal?', 'all_available_options': ['Yes', 'No'], 'actual_selections': []}
+]}
+
+
+class FakeReply:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, name, reply):
+        self.model_name = name
+        self.reply = reply
+        self.calls = 0
+    
+    def generate_content(self, parts):
+        self.calls += 1
+        return FakeReply(self.reply if isinstance(self.reply, str) else json.dumps(self.reply))
+
+
+@pytest.fixture
+def page(tmp_path, monkeypatch):
+    monkeypatch.setattr(vqa, 'VISION_CACHE_DIR', str(tmp_path / 'cache'))
+    path = tmp_path / 'page1.png'
+    Image.new('RGB', (40, 60), 'white').save(path)
+    return str(path)
+
+
+def make_analyzer(flash_reply, pro_reply):
+    analyzer = vqa.VisionQuestionnaireAnalyzer.__new__(vqa.VisionQuestionnaireAnalyzer)
+    analyzer.flash = FakeModel('gemini-1.5-flash', flash_reply)
+    analyzer.pro = FakeModel('gemini-1.5-pro', pro_reply)
+    return analyzer
+
+
+def test_answered_page_stays_on_flash_and_is_cached(page):
+    analyzer = make_analyzer(ANSWERED, ANSWERED)
+    assert analyzer._analyze_single_page(page) == ANSWERED
+    assert (analyzer.flash.calls, analyzer.pro.calls) == (1, 0)
+    
+    rerun = make_analyzer(ANSWERED, ANSWERED)
+    assert rerun._analyze_single_page(page) == ANSWERED
+    assert (rerun.flash.calls, rerun.pro.calls) == (0, 0)
+
+
+def test_blank_question_escalates_once_and_pro_result_is_cached(page):
+    analyzer = make_analyzer(BLANK, BLANK)
+    assert analyzer._analyze_single_page(page) == BLANK
+    assert (analyzer.flash.calls, analyzer.pro.calls) == (1, 1)
+    
+    # A genuinely unanswered question must not cost Flash + Pro on every rerun
+    rerun = make_analyzer(BLANK, BLANK)
+    assert rerun._analyze_single_page(page) == BLANK
+    assert (rerun.flash.calls, rerun.pro.calls) == (0, 0)
+
+
+def test_pro_fixes_flash_miss(page):
+    analyzer = make_analyzer(BLANK, ANSWERED)
+    assert analyzer._analyze_single_page(page) == ANSWERED
+    assert make_analyzer(BLANK, BLANK)._analyze_single_page(page) == ANSWERED
+
+
+def test_unparseable_reply_is_not_cached(page):
+    analyzer = make_analyzer('{not json', '{still not json')
+    assert 'parse_error' in analyzer._analyze_single_page(page)
+    
+    rerun = make_analyzer(ANSWERED, ANSWERED)
+    assert rerun._analyze_single_page(page) == ANSWERED
+    assert rerun.flash.calls == 1
@@ -0,0 +1,137 @@
+"""
+Tests for webhook redelivery dedupe in catsone/scripts/webhook_handler.py
+"""
+
+import threading
+import time
+import types
+
+import pytest
+
+pytest.importorskip('fastapi')
+pytest.importorskip('uvicorn')
+
+from fastapi.testclient import TestClient
+
+from catsone.scripts import webhook_handler as wh
+from catsone.utils import webhook_state
+
+
+class FakeAdapter:
+    def is_open(self):
+        return False
+
+
+class FakeCATS:
+    def __init__(self):
+        self.adapter = FakeAdapter()
+        self.invalidated = []
+    
+    def invalidate_candidate(self, candidate_id):
+        self.invalidated.append(candidate_id)
+    
+    def get_candidate_bundle(self, candidate_id, resources):
+        return {resource: [] for resource in resources}
+
+
+@pytest.fixture
+def state(monkeypatch, tmp_path):
+    shared = webhook_state.WebhookState(str(tmp_path / 'state.db'))
+    monkeypatch.setattr(wh, '_state', shared)
+    return shared
+
+
+@pytest.fixture
+def client(state):
+    cats = FakeCATS()
+    wh.app.dependency_overrides[wh.get_cats] = lambda: cats
+    wh.app.dependency_overrides[wh.get_processor] = lambda: None
+    yield TestClient(wh.app)
+    wh.app.dependency_overrides.clear()
+
+
+def test_event_key_uses_delivery_id_when_present():
+    first = wh.event_key('candidate.updated', 1, {'delivery_id': 'abc', 'timestamp': '1'})
+    again = wh.event_key('candidate.updated', 1, {'delivery_id': 'abc', 'timestamp': '2'})
+    other = wh.event_key('candidate.updated', 1, {'delivery_id': 'xyz', 'timestamp': '1'})
+    assert first == again
+    assert first != other
+
+
+def test_event_key_without_delivery_id_separates_distinct_events():
+    payload = {'event': 'candidate.updated', 'candidate_id': 1, 'timestamp': '2025-01-01T10:00:00'}
+    redelivery = dict(reversed(list(payload.items())))
+    later = dict(payload, timestamp='2025-01-01T10:00:05')
+    
+    assert wh.event_key('candidate.updated', 1, payload) == wh.event_key('candidate.updated', 1, redelivery)
+    assert wh.event_key('candidate.updated', 1, payload) != wh.event_key('candidate.updated', 1, later)
+
+
+def test_seen_recently_expires_after_ttl(monkeypatch, state):
+    now = [1000.0]
+    monkeypatch.setattr(webhook_state, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    
+    wh.mark_seen('k', ttl=10)
+    assert wh.seen_recently('k')
+    now[0] += 9.9
+    assert wh.seen_recently('k')
+    now[0] += 0.2
+    assert not wh.seen_recently('k')
+
+
+def test_forget_clears_key(state):
+    wh.mark_seen(('processed', 7, 3))
+    wh.forget(('processed', 7, 3))
+    assert not wh.seen_recently(('processed', 7, 3))
+
+
+def test_dedupe_is_shared_between_workers(state):
+    # A second worker process opens the same SQLite file
+    other = webhook_state.WebhookState(state.db_path)
+    assert wh.claim('delivery')
+    assert other.seen('delivery')
+    assert not other.claim('delivery', wh.DEDUPE_TTL)
+
+
+def test_candidate_lock_excludes_other_workers(monkeypatch, state):
+    monkeypatch.setattr(webhook_state, 'LOCK_POLL_INTERVAL', 0.01)
+    other = webhook_state.WebhookState(state.db_path)
+    order = []
+    
+    def other_worker():
+        with other.lock('candidate:7'):
+            order.append('other')
+    
+    with wh.candidate_lock(7):
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        time.sleep(0.1)
+        order.append('first')
+    thread.join(5)
+    assert order == ['first', 'other']
+    assert wh._candidate_locks == {}
+
+
+def test_expired_candidate_lock_is_taken_over(state):
+    other = webhook_state.WebhookState(state.db_path)
+    # A worker that died mid-run leaves a lease behind
+    assert other._try_lock('candidate:7', ttl=-1)
+    with wh.candidate_lock(7):
+        pass
+
+
+def test_redelivered_webhook_is_skipped(client):
+    payload = {'event': 'candidate.updated', 'candidate_id': 7, 'delivery_id': 'd-1'}
+    assert client.post('/webhook/candidate', json=payload).json()['status'] == 'accepted'
+    assert client.post('/webhook/candidate', json=payload).json()['status'] == 'duplicate'
+
+
+def test_second_update_without_delivery_id_is_not_dropped(client):
+    first = {'event': 'candidate.updated', 'candidate_id': 7, 'timestamp': '2025-01-01T10:00:00'}
+    second = {'event': 'candidate.attachment_added', 'candidate_id': 7, 'timestamp': '2025-01-01T10:00:04'}
+    edit = dict(first, timestamp='2025-01-01T10:00:08')
+    
+    assert client.post('/webhook/candidate', json=first).json()['status'] == 'accepted'
+    assert client.post('/webhook/candidate', json=second).json()['status'] == 'accepted'
+    # The attachment check found nothing, but a new update is still not a duplicate delivery
+    assert client.post('/webhook/candidate', json=edit).json()['status'] != 'duplicate'